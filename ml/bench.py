@@ -0,0 +1,307 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MLTUTS = os.path.join(HERE, 'mltuts')
+DEEPLEARNING = os.path.join(HERE, 'deeplearning')
+sys.path[:0] = [MLTUTS, DEEPLEARNING]
+
+import synth    # noqa: E402  (mltuts/synth.py)
+
+
+# Benchmarks for the core operation of every mltuts and deeplearning script
+#
+# Each benchmark has a setup (builds input data of n rows, not timed) and a run
+# (the operation the script demonstrates, timed). Input data for the csv based
+# scripts comes from synth.py, learned from the bundled csvs.
+#
+# For every benchmark and size we keep the best wall time of --repeat runs, the
+# throughput (rows/sec) and the peak traced memory. Results are appended to a
+# history file (json lines). A run fails (exit status 1) when a throughput drops,
+# or a peak memory grows, more than --threshold compared to the median of the
+# last --window runs in the history. Runs that regressed are saved marked as
+# such and left out of later baselines, so a regression doesn't become the new
+# normal; --accept saves a run as a baseline anyway (an expected change).
+#
+#   python bench.py                      # all benchmarks, default sizes
+#   python bench.py -k merge -k resample --scale 10
+#   python bench.py --no-save --threshold 0.3
+
+_MODELS = {}
+
+
+def _synthetic(name, n, seed=0):
+    if name not in _MODELS:
+        _MODELS[name] = synth.learn(os.path.join(MLTUTS, 'data', name))
+    return synth.generate_frame(_MODELS[name], n, seed)
+
+
+# 2-accessing-index-drop-groupby.py: filters and groupby
+
+def setup_filter_groupby(n):
+    return _synthetic('titanic.csv', n)
+
+
+def run_filter_groupby(df):
+    df[(df['Age'] > 43) & (df['Sex'] == 'male')]
+    df.groupby(['Sex', 'Survived'])['Age'].mean()
+
+
+# 3-datatime-resampling.py: resampling a time series
+
+def setup_resample(n):
+    index = pd.date_range('01/01/2018', periods=n, freq='60s')
+    return pd.DataFrame({'NumberOfVehicles': np.random.default_rng(0).integers(0, 20, n)}, index=index)
+
+
+def run_resample(df):
+    df.resample('W').sum()
+    df.resample('MS').sum()
+
+
+# 4-lambdas-iterators.py: the iteration styles
+
+def run_apply_rows(df):
+    df.apply(lambda row: row['Name'] + ' - ' + str(row['Sex']), axis=1)
+
+
+def run_itertuples(df):
+    [row.Name + ' - ' + str(row.Sex) for row in df.itertuples(index=False)]
+
+
+def run_vectorized(df):
+    df['Name'] + ' - ' + df['Sex'].astype(str)
+
+
+# 5-merges-join.py: joins
+
+def setup_merge(n):
+    rng = np.random.default_rng(0)
+    students = pd.DataFrame({
+        'roll': np.arange(n),
+        'class': rng.choice(['7A', '7B', '7C', '7D'], n),
+    }).set_index('roll')
+    marks = pd.DataFrame({
+        'roll': rng.permutation(n)[:n // 2],
+        'marks': rng.integers(0, 100, n // 2),
+    }).set_index('roll')
+    return students, marks
+
+
+def run_merge(frames):
+    students, marks = frames
+    pd.merge(students, marks, on='roll', how='left')
+    pd.merge(students, marks, left_index=True, right_index=True, how='outer')
+
+
+# 6-missing_values-label_encoding.py / 7- / 8-: imputation, encoding, split
+
+def setup_missing(n):
+    return _synthetic('missing.csv', n)
+
+
+def run_impute_encode(df):
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import LabelEncoder
+    features = df.iloc[:, :-1].to_numpy()
+    features[:, [1, 6]] = SimpleImputer(strategy='mean').fit_transform(features[:, [1, 6]])
+    cols = ['Occupation', 'Employment Status', 'Employement Type']
+    filled = df[cols].fillna(df[cols].mode().iloc[0])
+    for col in cols:
+        LabelEncoder().fit_transform(filled[col])
+
+
+def run_onehot_split(df):
+    from sklearn.compose import ColumnTransformer
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import OneHotEncoder
+    features = df.iloc[:, :-1].fillna(df.iloc[:, :-1].mode().iloc[0]).to_numpy()
+    ct = ColumnTransformer([('hotencoder', OneHotEncoder(), [0, 5])], remainder='passthrough')
+    train_test_split(ct.fit_transform(features), df.iloc[:, -1].to_numpy(), test_size=0.25, random_state=0)
+
+
+# 9-statistics.py: statistics
+
+def setup_matrix(n):
+    return np.random.default_rng(0).integers(0, 10, size=(n, 6))
+
+
+def run_statistics(matrix):
+    from scipy import stats
+    np.median(matrix)
+    np.var(matrix)
+    np.percentile(matrix, [25, 50, 75], axis=0)
+    stats.mode(matrix, axis=1)
+
+
+# 10-feature_scaling.py: scalers
+
+def setup_features(n):
+    return np.random.default_rng(0).normal(size=(n, 3))
+
+
+def run_scaling(x):
+    from sklearn import preprocessing
+    preprocessing.MinMaxScaler(feature_range=(0, 1)).fit_transform(x)
+    preprocessing.StandardScaler().fit_transform(x)
+    preprocessing.Normalizer().fit_transform(x)
+    preprocessing.Binarizer(threshold=0.5).fit_transform(x)
+
+
+# 11-outliers.py: elliptic envelope
+
+def setup_salary(n):
+    return _synthetic('Salary.csv', n).iloc[:, [1, 2]].to_numpy(dtype=np.float64)
+
+
+def run_outliers(features):
+    from sklearn.covariance import EllipticEnvelope
+    EllipticEnvelope(contamination=0.1, random_state=0).fit(features).predict(features)
+
+
+# deeplearning/1intro.py, 4ml.py: training the small keras models
+
+def setup_circles(n):
+    from sklearn.datasets import make_circles
+    return make_circles(n_samples=n, noise=0.1, factor=0.2, random_state=0)
+
+
+def run_train(data):
+    from tensorflow.keras.layers import Dense
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.optimizers import SGD
+    X, y = data
+    model = Sequential()
+    model.add(Dense(4, input_shape=(2,), activation='tanh'))
+    model.add(Dense(1, activation='sigmoid'))
+    model.compile(optimizer=SGD(learning_rate=0.5), loss='binary_crossentropy', metrics=['accuracy'])
+    model.fit(X, y, epochs=1, batch_size=256, verbose=0)
+    model.predict(X, batch_size=4096, verbose=0)
+
+
+# name: (setup, run, sizes)
+BENCHMARKS = {
+    'filter-groupby': (setup_filter_groupby, run_filter_groupby, [10 ** 4, 10 ** 5, 10 ** 6]),
+    'resample': (setup_resample, run_resample, [10 ** 5, 10 ** 6, 10 ** 7]),
+    'apply-rows': (setup_filter_groupby, run_apply_rows, [10 ** 3, 10 ** 4, 10 ** 5]),
+    'itertuples': (setup_filter_groupby, run_itertuples, [10 ** 4, 10 ** 5, 10 ** 6]),
+    'vectorized': (setup_filter_groupby, run_vectorized, [10 ** 4, 10 ** 5, 10 ** 6]),
+    'merge': (setup_merge, run_merge, [10 ** 4, 10 ** 5, 10 ** 6]),
+    'impute-encode': (setup_missing, run_impute_encode, [10 ** 4, 10 ** 5, 10 ** 6]),
+    'onehot-split': (setup_missing, run_onehot_split, [10 ** 4, 10 ** 5, 10 ** 6]),
+    'statistics': (setup_matrix, run_statistics, [10 ** 4, 10 ** 5, 10 ** 6]),
+    'scaling': (setup_features, run_scaling, [10 ** 4, 10 ** 5, 10 ** 6]),
+    'outliers': (setup_salary, run_outliers, [10 ** 3, 10 ** 4, 10 ** 5]),
+    'keras-train': (setup_circles, run_train, [10 ** 3, 10 ** 4, 10 ** 5]),
+}
+
+
+def measure(setup, run, n, repeat):
+    state = setup(n)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(state)
+        best = min(best, time.perf_counter() - start)
+    # tracing slows allocations down, memory gets its own run
+    tracemalloc.start()
+    run(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': best, 'rows_per_sec': n / best, 'peak_mb': peak / 2 ** 20}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def regressions(results, history, threshold, window):
+    # Compare against the median of the last `window` runs of the same benchmark/size
+    found = []
+    for key, result in results.items():
+        past = [run['results'][key] for run in history
+                if key in run['results'] and not run.get('regressions')][-window:]
+        if not past:
+            continue
+        base_rate = statistics.median(r['rows_per_sec'] for r in past)
+        base_mem = statistics.median(r['peak_mb'] for r in past)
+        if result['rows_per_sec'] < base_rate * (1 - threshold):
+            found.append('%s: throughput %.0f rows/sec, baseline %.0f' % (key, result['rows_per_sec'], base_rate))
+        if base_mem > 1 and result['peak_mb'] > base_mem * (1 + threshold):
+            found.append('%s: peak memory %.1f MB, baseline %.1f MB' % (key, result['peak_mb'], base_mem))
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for the mltuts and deeplearning workflows")
+    parser.add_argument('-k', dest='only', action='append', help='run benchmarks whose name contains this')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply every size by this')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed relative regression')
+    parser.add_argument('--window', type=int, default=5, help='history runs the baseline is computed from')
+    parser.add_argument('--history', default=os.path.join(HERE, 'bench_history.jsonl'))
+    parser.add_argument('--no-save', action='store_true', help="don't append this run to the history")
+    parser.add_argument('--accept', action='store_true', help='save this run as a baseline even if it regressed')
+    args = parser.parse_args(argv)
+
+    results = {}
+    print("%-16s %10s %10s %14s %10s" % ('benchmark', 'rows', 'seconds', 'rows/sec', 'peak MB'))
+    for name, (setup, run, sizes) in BENCHMARKS.items():
+        if args.only and not any(k in name for k in args.only):
+            continue
+        for size in sizes:
+            n = max(int(size * args.scale), 1)
+            try:
+                result = measure(setup, run, n, args.repeat)
+            except ImportError as e:
+                print("%-16s skipped (%s)" % (name, e))
+                break
+            results['%s@%d' % (name, n)] = result
+            print("%-16s %10d %10.3f %14.0f %10.1f" % (
+                name, n, result['seconds'], result['rows_per_sec'], result['peak_mb']))
+
+    history = load_history(args.history)
+    found = regressions(results, history, args.threshold, args.window)
+
+    if not args.no_save:
+        with open(args.history, 'a') as f:
+            f.write(json.dumps({
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'commit': _git_commit(),
+                'python': sys.version.split()[0],
+                'numpy': np.__version__,
+                'pandas': pd.__version__,
+                'results': results,
+                'regressions': [] if args.accept else found,
+            }) + '\n')
+
+    if found:
+        print('\nRegressions (threshold %d%%):' % (args.threshold * 100))
+        for line in found:
+            print('  ' + line)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
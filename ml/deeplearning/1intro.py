@@ -1,8 +1,14 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense
-from tensorflow.keras.optimizers import SGD
+from lazy import lazy_import, lazy_attr
+
+# matplotlib, tensorflow and sklearn are imported on first use (see lazy.py).
+# Running the whole script still loads them (it plots and trains below), but
+# running it cell by cell the numpy part right below doesn't wait for them.
+# python lazy.py checks that none of them is imported at the top level again
+plt = lazy_import('matplotlib.pyplot')
+Sequential = lazy_attr('tensorflow.keras.models', 'Sequential')
+Dense = lazy_attr('tensorflow.keras.layers', 'Dense')
+SGD = lazy_attr('tensorflow.keras.optimizers', 'SGD')
 
 
 # 2D matrix of zeros
@@ -30,6 +36,12 @@ noise = np.random.normal(loc=0.0, scale=0.1, size=(10, 5))
 # add noise to another matrix to get another
 e = d + noise
 
+# c, the c>0 mask, the gathered d and e are four new arrays. For large (image like)
+# matrices kernels.py multiplies the two strided checkerboard views of a into a
+# preallocated output and adds the noise in place, no mask and no temporaries:
+# from kernels import checker_multiply_add
+# e = checker_multiply_add(a, b, noise, out=np.empty((10, 5)))
+
 
 # plot matrix with grey colormap - plotted as checkerboard 
 plt.imshow(e, cmap='Greys')
@@ -65,8 +77,9 @@ def plot_decision_boundary(model, X, y):
 
 
 # Generating random sample sets
-from sklearn.datasets import make_circles
-from sklearn.datasets import make_blobs, make_moons
+make_circles = lazy_attr('sklearn.datasets', 'make_circles')
+make_blobs = lazy_attr('sklearn.datasets', 'make_blobs')
+make_moons = lazy_attr('sklearn.datasets', 'make_moons')
 
 X, y = make_circles(
     n_samples=1000,
@@ -82,6 +95,11 @@ Ax, Ay = make_blobs(
 )
 Bx, By = make_moons(n_samples=1000, noise=0.1)
 
+# datagen.py has the same three datasets built on numpy.random.Generator, generated
+# in parallel blocks and reproducible for a seed: circles(), blobs(), moons()
+# from datagen import circles
+# X, y = circles(n=1000, noise=0.1, factor=0.2, seed=0)
+
 
 # Plot sample training sets 
 
@@ -2,37 +2,50 @@ import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from decimate import decimate_frame, plot_decimated
 
-N = 1000
-# generate N points gaussian distributed with std-deviation of 0.1
-data1 = np.random.normal(0, 0.1, N)
-
-# generate gaussian distributed and push all points linearly increasing from 0 to 1 
-data2 = (np.random.normal(1, 0.4, N) + np.linspace(0, 1, N))
-
-# generate uniformally distributed data, with uniformally increased by 2 and linearly increasing from 1 to 5
-data3 = 2 + (np.random.random(N) + np.linspace(1, 5, N))
-
-# 2 + generate uniformally distributed data scaling it with data points linearly increasing from 1 to 5
-data4 = 2 + (np.random.random(N) * np.linspace(1, 5, N))
 
-# gaussian distributed data increased with a sine data
-data5 = (np.random.normal(3, 0.2, N) + 0.3 * np.sin(np.linspace(0, 20, N)))
-
-
-# Create a data frame with data vertically stacked
-data = np.vstack([data1, data2, data3, data4, data5])
-data = data.transpose()
-cols = ['data1', 'data2', 'data3', 'data4', 'data5']
-df = pd.DataFrame(data, columns=cols)
+N = 1000
+# Before: every series is generated as a separate array, vstack copies them all again
+# and the result has to be transposed
+#
+# # generate N points gaussian distributed with std-deviation of 0.1
+# data1 = np.random.normal(0, 0.1, N)
+#
+# # generate gaussian distributed and push all points linearly increasing from 0 to 1
+# data2 = (np.random.normal(1, 0.4, N) + np.linspace(0, 1, N))
+#
+# # generate uniformally distributed data, with uniformally increased by 2 and linearly increasing from 1 to 5
+# data3 = 2 + (np.random.random(N) + np.linspace(1, 5, N))
+#
+# # 2 + generate uniformally distributed data scaling it with data points linearly increasing from 1 to 5
+# data4 = 2 + (np.random.random(N) * np.linspace(1, 5, N))
+#
+# # gaussian distributed data increased with a sine data
+# data5 = (np.random.normal(3, 0.2, N) + 0.3 * np.sin(np.linspace(0, 20, N)))
+#
+# # Create a data frame with data vertically stacked
+# data = np.vstack([data1, data2, data3, data4, data5])
+# data = data.transpose()
+# cols = ['data1', 'data2', 'data3', 'data4', 'data5']
+# df = pd.DataFrame(data, columns=cols)
+
+# Now: datagen.py fills one (N, 5) array column by column in place, in parallel
+# threads, with a numpy Generator stream per column (same output for a seed,
+# whatever the number of threads). PANDAS_SERIES holds the same 5 formulas as above
+from datagen import generate_frame, PANDAS_SERIES
+df = generate_frame(N, PANDAS_SERIES, seed=0, dtype=np.float32)   # float32 is plenty for plotting, half the memory
 
 # Plotting using dataframe:
-df.plot(title='Line plot');
+# For long series (millions of points) most points fall on the same pixel,
+# decimate_frame keeps only the min and max of every pixel column, the plot looks
+# the same as df.plot(title='Line plot') without sending every point to matplotlib
+decimate_frame(df, width=1000).plot(title='Line plot');
 df.plot(style='.', title='Scatter Plot'); # Plot with dots
 
 # Plot using matplotlib
 from matplotlib import pyplot as plt
-plt.plot(df)
+plot_decimated(plt.gca(), df)   # same as plt.plot(df), with min/max decimation
 plt.title('Line plot')
 plt.legend(['data1', 'data2', 'data3', 'data4']);
 
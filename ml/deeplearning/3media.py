@@ -2,13 +2,23 @@ import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from decimate import plot_decimated
+
 from PIL import Image
 img = Image.open('../data/iss.jpg')
 imgarray = np.asarray(img) # imgarray.shape will be width x height x channels
 
+# For a folder of images (e.g. to train a keras model), decode them in a thread pool
+# straight into one (N, H, W, C) uint8 array instead of one np.asarray per image
+# from imageloader import ImageDataset
+# with ImageDataset('../data/images', size=(128, 128), out_path='../data/images.npy') as ds:
+#     for batch in ds.batches(batch_size=32):
+#         model.train_on_batch(batch / 255.0, ...)
+
 
 from scipy.io import wavfile
-rate, snd = wavfile.read(filename='../data/sms.wav')
+rate, snd = wavfile.read(filename='../data/sms.wav', mmap=True)
+# mmap=True doesn't read the file, snd is a memory map and only the parts sliced are loaded
 # rate tells you the frequency of data collection or play
 # 44.1 kHz means 44100 times per second. So a 3-second file contains over 100k samples,
 # with each second, we have 44100 sample of sound frequencies
@@ -16,13 +26,23 @@ rate, snd = wavfile.read(filename='../data/sms.wav')
 from IPython.display import Audio
 Audio(data=snd, rate=rate) # render wav file in audio embeded in HTML
 
-plt.plot(snd) # Plot the snd data, which is an array of 
+# Plot the snd data, which is an array of samples. A few seconds of audio are
+# already 100k+ samples, so instead of plt.plot(snd) plot only the min and max of
+# each pixel column, it draws the same waveform
+plot_decimated(plt.gca(), snd)
 
 # Raw audio is an array of audio frequencies and isn't the best representation
 # One way is to create a Spectogram out of it.
 # The Spectogram is a FFT transform which shows at what time, what all frequencies were active
 # The spectogram will give a colored density graph for frequency bins in a given time bin
-_ = plt.specgram(snd, NFFT=1024, Fs=44100)
+_ = plt.specgram(snd, NFFT=1024, Fs=rate)   # use the rate of the file, not a hardcoded 44100
 plt.ylabel('Frequency (Hz)')
 plt.xlabel('Time (s)')
 plt.title('sms.wav as a Spectrogram');
+
+# For long recordings, compute the spectrogram in batches of frames and cache the
+# tiles on disk (see audio.py), the second render doesn't redo any FFT
+from audio import SpectrogramCache
+spectrograms = SpectrogramCache('../data/.spectrograms', nfft=1024)
+spectrograms.render('../data/sms.wav', plt.figure().gca())
+plt.title('sms.wav as a Spectrogram (cached tiles)');
@@ -11,14 +11,19 @@
 # Given a weight to height datafrae df, to create a model predict w and b
 
 import pandas as pd
+from lazy import lazy_attr
 
+# keras computes in its floatx dtype (float32 unless tf.keras.backend.set_floatx
+# changes it): inputs already in that dtype save a converted copy on every fit/predict
+floatx = lazy_attr('tensorflow.keras.backend', 'floatx')
 
-X = df[['Height']].values   # Note the [[ instead of simple array of height values, we get
+
+X = df[['Height']].values.astype(floatx())   # Note the [[ instead of simple array of height values, we get
                             # a array with each item being a coordinate in 1 dimension space [[x1], [x2], [x3], [x4]]
                             # The generalised format will be m points, n dimensions [[x11,x12... x1n]... [x21, x22... xmn]]
                             # m x n matrix = m points, n dimensions
 
-y_true = df['Weight'].values    # this is a straight forward array of weight values [y1, y2.... ym]
+y_true = df['Weight'].values.astype(floatx())    # this is a straight forward array of weight values [y1, y2.... ym]
 
 # support y_pred is the values predicted by the model for all values X
 # The optimization function is to find w and b to minimize mean_squared_error
@@ -29,9 +34,11 @@ def mean_squared_error(y_true, y_pred):
 
 # Solving the optimization problem
 
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense
-from tensorflow.keras.optimizers import Adam, SGD
+# tensorflow takes seconds to import, lazy_attr defers it until the model is built
+Sequential = lazy_attr('tensorflow.keras.models', 'Sequential')
+Dense = lazy_attr('tensorflow.keras.layers', 'Dense')
+Adam = lazy_attr('tensorflow.keras.optimizers', 'Adam')
+SGD = lazy_attr('tensorflow.keras.optimizers', 'SGD')
 
 model = Sequential()    # Define model for keras
 model.add(Dense(1, input_shape=(1,)))   # Define Dense, which implements linear model y = wX + b
@@ -61,22 +68,27 @@ model.fit(X, y_true, epochs=40, verbose=0);
 # Get output of predictions
 y_pred = model.predict(X)
 
+# predict() has a fixed cost per call, for single row requests it's most of the time.
+# To serve a model, serve.py batches the requests arriving together into one predict:
+#   model.save('weights.keras'); then python serve.py weights.keras 8765
+# and loadtest.py reports the latency and throughput of such a server
+
 W, B = model.get_weights()  # Get w and b as parameters to the model
                             # In this case w will be a [[]] and b will be []
                             # Which fits y = wX + b dimentionality
 
 
 # Evaluating model performance for a regression using R2 Score
-from sklearn.metrics import r2_score
+r2_score = lazy_attr('sklearn.metrics', 'r2_score')
 r = r2_score(y_true, y_pred)
 print("The R2 score is {:0.3f}".format(r))
 
 # The right way to approach is divide the dataset into 2 parts, training and testing.
-from sklearn.model_selection import train_test_split
+train_test_split = lazy_attr('sklearn.model_selection', 'train_test_split')
 
 
 X_train, X_test, y_train, y_test = train_test_split(X, y_true, test_size=0.2)   # 20% for testing, rest for training
 
 # Mean square error can be calculated with
-from sklearn.metrics import mean_squared_error as mse
+mse = lazy_attr('sklearn.metrics', 'mean_squared_error')
 
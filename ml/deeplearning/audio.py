@@ -0,0 +1,116 @@
+import hashlib
+import os
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# Chunked audio pipeline
+#
+# wavfile.read(..., mmap=True) returns the samples as a memory map, nothing is
+# read until it is sliced. The spectrogram is computed a batch of frames at a
+# time: a batch is a strided view of overlapping windows over the samples (no
+# copy per frame) and one vectorized rfft, so memory stays constant however
+# long the recording is.
+#
+# Computed batches (tiles) are cached on disk, re-rendering a spectrogram only
+# reads the tiles back instead of redoing the FFTs.
+
+
+def open_wav(path):
+    from scipy.io import wavfile
+    rate, snd = wavfile.read(path, mmap=True)
+    return rate, snd
+
+
+def _mono(samples):
+    # Mix channels down, works on one batch at a time so the memmap isn't read fully
+    samples = np.asarray(samples, dtype=np.float32)
+    if samples.ndim == 2:
+        samples = samples.mean(axis=1)
+    return samples
+
+
+def stft_frames(snd, rate, nfft=1024, noverlap=128, batch_frames=512):
+    # Yields (first_frame_index, psd) with psd of shape (frames, nfft // 2 + 1),
+    # scaled like plt.specgram(snd, NFFT=nfft, Fs=rate, noverlap=noverlap)
+    hop = nfft - noverlap
+    n_frames = (len(snd) - noverlap) // hop
+    window = np.hanning(nfft).astype(np.float32)
+    scale = 1.0 / (rate * (window ** 2).sum())
+
+    for first in range(0, n_frames, batch_frames):
+        count = min(batch_frames, n_frames - first)
+        start = first * hop
+        stop = start + (count - 1) * hop + nfft
+        chunk = _mono(snd[start:stop])
+        frames = sliding_window_view(chunk, nfft)[::hop]
+        spectrum = np.fft.rfft(frames * window, axis=1)
+        psd = (spectrum.real ** 2 + spectrum.imag ** 2) * scale
+        # one sided spectrum: everything but DC (and Nyquist for even nfft) counts twice
+        psd[:, 1:nfft // 2 + nfft % 2] *= 2
+        yield first, psd.astype(np.float32)
+
+
+class SpectrogramCache:
+    def __init__(self, cache_dir, nfft=1024, noverlap=128, tile_frames=512):
+        self.cache_dir = cache_dir
+        self.nfft = nfft
+        self.noverlap = noverlap
+        self.tile_frames = tile_frames
+
+    def _tile_dir(self, path):
+        # Key on the file identity and the FFT parameters, a changed file or
+        # different parameters get their own tiles
+        st = os.stat(path)
+        key = '%s|%d|%d|%d|%d|%d' % (
+            os.path.abspath(path), st.st_size, st.st_mtime_ns,
+            self.nfft, self.noverlap, self.tile_frames
+        )
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, digest)
+
+    def tiles(self, path):
+        # Yields (first_frame_index, psd tile), computing only the missing tiles
+        tile_dir = self._tile_dir(path)
+        done = os.path.join(tile_dir, 'complete')
+        if os.path.exists(done):
+            names = sorted(n for n in os.listdir(tile_dir) if n.endswith('.npy'))
+            for name in names:
+                yield int(name[5:-4]), np.load(os.path.join(tile_dir, name), mmap_mode='r')
+            return
+
+        os.makedirs(tile_dir, exist_ok=True)
+        rate, snd = open_wav(path)
+        for first, psd in stft_frames(snd, rate, self.nfft, self.noverlap, self.tile_frames):
+            # written to a temp file and renamed: a run killed mid write can't
+            # leave a truncated tile behind for the next run to mark complete
+            tile_path = os.path.join(tile_dir, 'tile-%09d.npy' % first)
+            tmp_path = '%s.%d.tmp' % (tile_path, os.getpid())
+            with open(tmp_path, 'wb') as f:
+                np.save(f, psd)
+            os.replace(tmp_path, tile_path)
+            yield first, psd
+        open(done, 'w').close()
+
+    def render(self, path, ax, width=2000):
+        # Draws the spectrogram with at most `width` time columns, each column
+        # is the max of the frames falling in it. Memory is one tile plus the image.
+        rate, snd = open_wav(path)
+        hop = self.nfft - self.noverlap
+        n_frames = (len(snd) - self.noverlap) // hop
+        width = min(width, n_frames)
+        image = np.full((self.nfft // 2 + 1, width), -np.inf, dtype=np.float32)
+
+        for first, psd in self.tiles(path):
+            columns = (np.arange(first, first + len(psd)) * width) // n_frames
+            starts = np.flatnonzero(np.r_[True, columns[1:] != columns[:-1]])
+            pooled = np.maximum.reduceat(np.asarray(psd), starts, axis=0)
+            np.maximum.at(image.T, columns[starts], pooled)
+
+        duration = len(snd) / rate
+        ax.imshow(10 * np.log10(image + 1e-20), origin='lower', aspect='auto',
+                  extent=(0, duration, 0, rate / 2))
+        ax.set_ylabel('Frequency (Hz)')
+        ax.set_xlabel('Time (s)')
+        return image
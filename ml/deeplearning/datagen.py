@@ -0,0 +1,234 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+# Synthetic datasets with numpy.random.Generator, filled in place and in parallel
+#
+# np.vstack([data1, ..., data5]).transpose() allocates every series separately,
+# copies them all into a new (5, N) array and leaves a transposed view of it.
+# Here the (N, k) array is allocated once, in Fortran order so every column is
+# contiguous, and each column is filled in place block by block:
+#
+#   Normal(1, 0.4) + Linspace(0, 1)
+#
+# draws the normals straight into the column and adds the ramp in place (the
+# only temporary is one block of the right operand).
+#
+# Every (column, block of rows) gets its own random stream, spawned from the
+# seed with SeedSequence.spawn. Blocks have a fixed size, so the output is bit
+# for bit the same whatever the number of threads (numpy releases the GIL while
+# drawing, threads do run in parallel).
+
+BLOCK_ROWS = 1 << 18
+
+
+class Expr:
+    # fill(rng, out, start, total): write rows start .. start + len(out) of a
+    # column of `total` rows into out
+    def fill(self, rng, out, start, total):
+        raise NotImplementedError
+
+    def __add__(self, other):
+        return _Binary(self, _expr(other), np.add)
+
+    __radd__ = __add__
+
+    def __mul__(self, other):
+        return _Binary(self, _expr(other), np.multiply)
+
+    __rmul__ = __mul__
+
+    def __sub__(self, other):
+        return _Binary(self, _expr(other), np.subtract)
+
+    def __rsub__(self, other):
+        return _Binary(_expr(other), self, np.subtract)
+
+
+class Const(Expr):
+    def __init__(self, value):
+        self.value = value
+
+    def fill(self, rng, out, start, total):
+        out[...] = self.value
+
+
+def _expr(value):
+    return value if isinstance(value, Expr) else Const(value)
+
+
+class Normal(Expr):
+    def __init__(self, loc=0.0, scale=1.0):
+        self.loc, self.scale = loc, scale
+
+    def fill(self, rng, out, start, total):
+        rng.standard_normal(dtype=out.dtype, out=out)
+        out *= self.scale
+        out += self.loc
+
+
+class Uniform(Expr):
+    def __init__(self, low=0.0, high=1.0):
+        self.low, self.high = low, high
+
+    def fill(self, rng, out, start, total):
+        rng.random(dtype=out.dtype, out=out)
+        if (self.low, self.high) != (0.0, 1.0):
+            out *= self.high - self.low
+            out += self.low
+
+
+class Linspace(Expr):
+    # np.linspace(start, stop, total), only the rows of this block
+    def __init__(self, start, stop):
+        self.start, self.stop = start, stop
+
+    def fill(self, rng, out, start, total):
+        step = (self.stop - self.start) / max(total - 1, 1)
+        out[...] = np.arange(start, start + len(out), dtype=out.dtype)
+        out *= step
+        out += self.start
+
+
+class Sin(Expr):
+    def __init__(self, inner):
+        self.inner = _expr(inner)
+
+    def fill(self, rng, out, start, total):
+        self.inner.fill(rng, out, start, total)
+        np.sin(out, out=out)
+
+
+class _Binary(Expr):
+    def __init__(self, left, right, op):
+        self.left, self.right, self.op = left, right, op
+
+    def fill(self, rng, out, start, total):
+        self.left.fill(rng, out, start, total)
+        if isinstance(self.right, Const):
+            self.op(out, self.right.value, out=out)
+            return
+        tmp = np.empty_like(out)
+        self.right.fill(rng, tmp, start, total)
+        self.op(out, tmp, out=out)
+
+
+# The five series of 2pandas.py
+PANDAS_SERIES = {
+    'data1': Normal(0, 0.1),
+    'data2': Normal(1, 0.4) + Linspace(0, 1),
+    'data3': 2 + (Uniform() + Linspace(1, 5)),
+    'data4': 2 + (Uniform() * Linspace(1, 5)),
+    'data5': Normal(3, 0.2) + 0.3 * Sin(Linspace(0, 20)),
+}
+
+
+def _blocks(n, block_rows):
+    return [(lo, min(lo + block_rows, n)) for lo in range(0, n, block_rows)]
+
+
+def generate(n, columns, seed=0, workers=None, dtype=np.float64, out=None, block_rows=BLOCK_ROWS):
+    # columns: {name: Expr}. Returns an (n, k) Fortran ordered array; out, if
+    # given, must be one (of that shape and dtype)
+    exprs = list(columns.values())
+    if out is None:
+        out = np.empty((n, len(exprs)), dtype=dtype, order='F')
+    else:
+        # every column is filled in place, so each one has to be contiguous
+        if out.shape != (n, len(exprs)):
+            raise ValueError("out has shape %s, expected %s" % (out.shape, (n, len(exprs))))
+        if out.dtype != np.dtype(dtype):
+            raise ValueError("out has dtype %s but dtype=%s was asked" % (out.dtype, np.dtype(dtype)))
+        if not out.flags.f_contiguous:
+            raise ValueError("out must be Fortran ordered, e.g. np.empty((n, k), order='F')")
+    blocks = _blocks(n, block_rows)
+    column_seeds = np.random.SeedSequence(seed).spawn(len(exprs))
+    tasks = [
+        (j, lo, hi, ss)
+        for j, column_seed in enumerate(column_seeds)
+        for (lo, hi), ss in zip(blocks, column_seed.spawn(len(blocks)))
+    ]
+
+    def fill(task):
+        j, lo, hi, ss = task
+        exprs[j].fill(np.random.default_rng(ss), out[lo:hi, j], lo, n)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(fill, tasks))
+    return out
+
+
+def generate_frame(n, columns=PANDAS_SERIES, seed=0, workers=None, dtype=np.float64):
+    data = generate(n, columns, seed, workers, dtype)
+    # the transposed Fortran array is C contiguous: it becomes the frame's block as is
+    return pd.DataFrame(data, columns=list(columns), copy=False)
+
+
+# 1intro.py datasets: (X, y) like sklearn's make_circles / make_moons / make_blobs
+# (not shuffled), rows generated in parallel blocks with their own streams
+
+def _points(n, fill_block, seed, workers, dtype, block_rows):
+    X = np.empty((n, 2), dtype=dtype)
+    y = np.empty(n, dtype=np.int64)
+    blocks = _blocks(n, block_rows)
+    seeds = np.random.SeedSequence(seed).spawn(len(blocks))
+
+    def fill(task):
+        (lo, hi), ss = task
+        fill_block(np.random.default_rng(ss), X[lo:hi], y[lo:hi], np.arange(lo, hi))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(fill, zip(blocks, seeds)))
+    return X, y
+
+
+def _add_noise(rng, X, noise):
+    if noise:
+        X += noise * rng.standard_normal(X.shape, dtype=X.dtype)
+
+
+def circles(n=1000, noise=None, factor=0.8, seed=0, workers=None, dtype=np.float64, block_rows=BLOCK_ROWS):
+    n_out = n // 2
+    n_in = n - n_out
+
+    def fill_block(rng, X, y, rows):
+        inner = rows >= n_out
+        y[...] = inner
+        angle = np.where(inner, (rows - n_out) / n_in, rows / max(n_out, 1)) * 2 * np.pi
+        radius = np.where(inner, factor, 1.0)
+        X[:, 0] = radius * np.cos(angle)
+        X[:, 1] = radius * np.sin(angle)
+        _add_noise(rng, X, noise)
+
+    return _points(n, fill_block, seed, workers, dtype, block_rows)
+
+
+def moons(n=1000, noise=None, seed=0, workers=None, dtype=np.float64, block_rows=BLOCK_ROWS):
+    n_out = n // 2
+    n_in = n - n_out
+
+    def fill_block(rng, X, y, rows):
+        inner = rows >= n_out
+        y[...] = inner
+        t = np.where(inner, (rows - n_out) / max(n_in - 1, 1), rows / max(n_out - 1, 1)) * np.pi
+        X[:, 0] = np.where(inner, 1 - np.cos(t), np.cos(t))
+        X[:, 1] = np.where(inner, 1 - np.sin(t) - 0.5, np.sin(t))
+        _add_noise(rng, X, noise)
+
+    return _points(n, fill_block, seed, workers, dtype, block_rows)
+
+
+def blobs(n=1000, centers=2, cluster_std=1.0, center_box=(-10.0, 10.0), seed=0,
+          workers=None, dtype=np.float64, block_rows=BLOCK_ROWS):
+    center_seed, points_seed = np.random.SeedSequence(seed).spawn(2)
+    center_xy = np.random.default_rng(center_seed).uniform(*center_box, size=(centers, 2))
+
+    def fill_block(rng, X, y, rows):
+        y[...] = rows * centers // n
+        rng.standard_normal(dtype=X.dtype, out=X)
+        X *= cluster_std
+        X += center_xy[y]
+
+    return _points(n, fill_block, points_seed, workers, dtype, block_rows)
@@ -0,0 +1,134 @@
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+
+# Downsampling long series before plotting
+#
+# A line plot 1000 pixels wide can't show more than ~1000 distinct x positions,
+# with millions of points most of them land on the same pixel column. Keeping
+# only the min and the max of every pixel bucket draws exactly the same picture
+# (the vertical extent of each column is preserved) with 2 points per pixel.
+#
+# LTTB (largest triangle three buckets) keeps one point per bucket, the one
+# making the largest triangle with its neighbours. It keeps the shape, not
+# the exact extent, useful for scatter like plots where 2x points is too many.
+
+
+def minmax_indices(y, width):
+    # Indices (sorted) of the min and max of each of `width` buckets of y
+    n = len(y)
+    if n <= 2 * width:
+        return np.arange(n)
+    size = n // width
+    main = y[:size * width].reshape(width, size)
+    offsets = np.arange(width) * size
+    imin = main.argmin(axis=1) + offsets
+    imax = main.argmax(axis=1) + offsets
+    idx = np.empty(2 * width, dtype=np.intp)
+    idx[0::2] = np.minimum(imin, imax)
+    idx[1::2] = np.maximum(imin, imax)
+    rest = n - size * width
+    if rest:
+        tail = y[size * width:]
+        idx = np.concatenate([idx, np.sort([tail.argmin(), tail.argmax()]) + size * width])
+    return idx
+
+
+def minmax_decimate(y, width):
+    y = np.asarray(y)
+    idx = minmax_indices(y, width)
+    return idx, y[idx]
+
+
+def lttb(x, y, n_out):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # first and last points are always kept, the rest is split in n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    idx = np.empty(n_out, dtype=np.intp)
+    idx[0], idx[-1] = 0, n - 1
+    selected = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # average of the next bucket (or the last point) is the third vertex
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        ax, ay = x[selected], y[selected]
+        bx, by = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((ax - bx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (by - ay))
+        selected = lo + int(area.argmax())
+        idx[i + 1] = selected
+    return idx
+
+
+def _pixel_width(ax):
+    fig = ax.get_figure()
+    return int(fig.get_figwidth() * fig.dpi)
+
+
+def decimate_frame(df, width):
+    # Union of the min/max rows of every column, so df.plot() on the result
+    # looks the same as on the full frame
+    keep = np.unique(np.concatenate([
+        minmax_indices(df[col].to_numpy(), width) for col in df.columns
+    ]))
+    return df.iloc[keep]
+
+
+def plot_decimated(ax, y, *args, width=None, method='minmax', **kwargs):
+    # Drop-in for ax.plot(y) on a 1D array, a 2D array (one line per column)
+    # or a DataFrame
+    width = width or _pixel_width(ax)
+    if hasattr(y, 'columns'):
+        y = y.to_numpy()
+    y = np.asarray(y)
+    columns = y.reshape(len(y), -1).T
+    lines = []
+    for col in columns:
+        if method == 'lttb':
+            idx = lttb(np.arange(len(col)), col, 2 * width)
+        else:
+            idx = minmax_indices(col, width)
+        lines.extend(ax.plot(idx, col[idx], *args, **kwargs))
+    return lines
+
+
+# Benchmark: render time and memory for 10^6 .. 10^8 points, full vs decimated
+#   python decimate.py 6 7 8
+
+def _render(y, decimated):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 4), dpi=100)
+    tracemalloc.start()
+    start = time.perf_counter()
+    if decimated:
+        plot_decimated(ax, y)
+    else:
+        ax.plot(y)
+    fig.canvas.draw()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    plt.close(fig)
+    return elapsed, peak
+
+
+if __name__ == '__main__':
+    import matplotlib
+    matplotlib.use('Agg')
+
+    exponents = [int(e) for e in sys.argv[1:]] or [6, 7]
+    print("%10s %12s %12s %14s %14s" % ('points', 'full [s]', 'minmax [s]', 'full [MB]', 'minmax [MB]'))
+    for e in exponents:
+        y = np.cumsum(np.random.default_rng(e).normal(size=10 ** e))
+        full_t, full_m = _render(y, decimated=False)
+        dec_t, dec_m = _render(y, decimated=True)
+        print("%10s %12.3f %12.3f %14.1f %14.1f" % (
+            '10^%d' % e, full_t, dec_t, full_m / 2 ** 20, dec_m / 2 ** 20
+        ))
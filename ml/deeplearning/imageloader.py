@@ -0,0 +1,170 @@
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+
+# Batched image loading into one preallocated tensor
+#
+# np.asarray(Image.open(path)) per image allocates a new array for every file and
+# stacking them for keras copies everything again. ImageDataset allocates the
+# (N, H, W, C) uint8 tensor once (optionally as a memory mapped .npy file, so it
+# can be larger than RAM and reused by the next run) and every decoded image is
+# written straight into its slot.
+#
+# With out_path the decoded mask is memory mapped too (out_path + '.decoded.npy')
+# and out_path + '.json' records the paths, size and draft setting. A later
+# ImageDataset with the same ones reopens both files and only decodes the images
+# still missing; anything else (or reuse=False) starts a new tensor.
+#
+# JPEG draft mode lets the decoder do the downscaling: img.draft('RGB', (w, h))
+# decodes at 1/2, 1/4 or 1/8 of the resolution (the smallest still >= w x h),
+# which is much faster than decoding the full image and resizing it.
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif')
+
+
+def list_images(folder):
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(folder)
+        for name in names
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def decode_into(out, path, size, draft=True):
+    # Decode path, resized to size=(height, width), into out (an (H, W, C) slice)
+    from PIL import Image
+    height, width = size
+    with Image.open(path) as img:
+        if draft:
+            img.draft('RGB', (width, height))
+        img = img.convert('RGB')
+        if img.size != (width, height):
+            img = img.resize((width, height), Image.BILINEAR)
+        out[...] = np.asarray(img)
+
+
+def _decode_to_file(tensor_path, index, path, size, draft):
+    # Process pool worker: opens the shared memory mapped tensor and writes its slot
+    tensor = np.load(tensor_path, mmap_mode='r+')
+    decode_into(tensor[index], path, size, draft)
+    tensor.flush()
+    return index
+
+
+def _reusable(out_path, settings, shape):
+    # the tensor and mask of a previous run, if they were built from the same settings
+    try:
+        with open(out_path + '.json') as f:
+            if json.load(f) != settings:
+                return False
+        tensor = np.load(out_path, mmap_mode='r')
+        decoded = np.load(out_path + '.decoded.npy', mmap_mode='r')
+    except (OSError, ValueError):
+        return False
+    return tensor.shape == shape and tensor.dtype == np.uint8 and decoded.shape == shape[:1]
+
+
+class ImageDataset:
+    def __init__(self, paths, size=(224, 224), out_path=None, workers=None,
+                 use_processes=False, draft=True, reuse=True):
+        if isinstance(paths, str):
+            paths = list_images(paths)
+        self.paths = list(paths)
+        self.size = size
+        self.draft = draft
+        self.out_path = out_path
+        shape = (len(self.paths), size[0], size[1], 3)
+        if out_path:
+            settings = {'paths': self.paths, 'size': list(size), 'draft': draft}
+            if reuse and _reusable(out_path, settings, shape):
+                self.tensor = np.lib.format.open_memmap(out_path, mode='r+')
+                self.decoded = np.lib.format.open_memmap(out_path + '.decoded.npy', mode='r+')
+            else:
+                # the settings are written last: an interrupted setup is never reused
+                if os.path.exists(out_path + '.json'):
+                    os.remove(out_path + '.json')
+                self.tensor = np.lib.format.open_memmap(out_path, mode='w+', dtype=np.uint8, shape=shape)
+                self.decoded = np.lib.format.open_memmap(out_path + '.decoded.npy', mode='w+',
+                                                         dtype=bool, shape=shape[:1])
+                self.decoded.flush()
+                with open(out_path + '.json', 'w') as f:
+                    json.dump(settings, f)
+        else:
+            self.tensor = np.empty(shape, dtype=np.uint8)
+            self.decoded = np.zeros(len(self.paths), dtype=bool)
+
+        if use_processes:
+            # processes can only share the tensor through the memory mapped file
+            if not out_path:
+                raise ValueError("use_processes=True needs out_path for the shared tensor")
+            self.tensor.flush()
+            self._pool = ProcessPoolExecutor(max_workers=workers)
+        else:
+            # PIL releases the GIL while decoding, threads are usually enough
+            self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._use_processes = use_processes
+
+    def __len__(self):
+        return len(self.paths)
+
+    def _submit(self, index):
+        if self._use_processes:
+            return self._pool.submit(_decode_to_file, self.out_path, index,
+                                     self.paths[index], self.size, self.draft)
+        return self._pool.submit(decode_into, self.tensor[index], self.paths[index],
+                                 self.size, self.draft)
+
+    def _decode(self, indices):
+        return [self._submit(i) for i in indices if not self.decoded[i]]
+
+    def load(self):
+        # Decode everything, returns the full (N, H, W, C) tensor
+        for future in self._decode(range(len(self))):
+            future.result()
+        self.decoded[:] = True
+        return self.tensor
+
+    def batches(self, batch_size=32, prefetch=2, shuffle=False, seed=None):
+        # Yields (N_batch, H, W, C) arrays. The next `prefetch` batches are
+        # decoding in the pool while the current one is used by the training loop.
+        order = np.arange(len(self))
+        if shuffle:
+            np.random.default_rng(seed).shuffle(order)
+        chunks = [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+        pending = deque()
+        for chunk in chunks[:prefetch + 1]:
+            pending.append((chunk, self._decode(chunk)))
+        next_chunk = prefetch + 1
+
+        while pending:
+            chunk, futures = pending.popleft()
+            for future in futures:
+                future.result()
+            self.decoded[chunk] = True
+            if next_chunk < len(chunks):
+                pending.append((chunks[next_chunk], self._decode(chunks[next_chunk])))
+                next_chunk += 1
+            # contiguous chunks are a view of the tensor, shuffled ones a gather
+            if shuffle:
+                yield self.tensor[chunk]
+            else:
+                yield self.tensor[chunk[0]:chunk[-1] + 1]
+
+    def close(self):
+        self._pool.shutdown()
+        if self.out_path:
+            # images before the mask marking them decoded
+            self.tensor.flush()
+            self.decoded.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,117 @@
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+
+# Checkerboard kernels on strided views, writing into preallocated buffers
+#
+# 1intro.py does
+#   c = a * b                          # new (n, m) array
+#   d = c[c > 0].reshape(n, m // 2)    # (n, m) bool mask + a gathered copy
+#   e = d + noise                      # new (n, m // 2) array
+# The cells kept by the mask are known in advance: the checkerboard has them on
+# even columns of even rows and on odd columns of odd rows. So
+#   d[0::2] = a[0::2, 0::2] * b[0::2]
+#   d[1::2] = a[1::2, 1::2] * b[1::2]
+# are two multiplies of strided views (no copy of a, no mask) straight into d,
+# and the noise is added in place. Same result as the mask as long as every
+# checkerboard cell of a * b is > 0 (the mask also drops cells that are 0).
+#
+#   out = np.empty((n, m // 2))
+#   checker_multiply_add(a, b, noise, out=out)     # e, without c or d
+#
+#   python kernels.py 10000      # time and peak memory against the expressions, 10^4 x 10^4
+
+
+def checkerboard(n, m, dtype=np.float64, out=None):
+    # a of 1intro.py: ones on the checkerboard, zeros elsewhere
+    if out is None:
+        out = np.zeros((n, m), dtype=dtype)
+    else:
+        out[...] = 0
+    out[0::2, 0::2] = 1
+    out[1::2, 1::2] = 1
+    return out
+
+
+def checker_cells(a):
+    # the two strided views holding the checkerboard cells (no copies)
+    return a[0::2, 0::2], a[1::2, 1::2]
+
+
+def checker_multiply(a, b, out=None):
+    # (a * b)[checkerboard].reshape(n, m // 2) for an even m
+    n, m = a.shape
+    if m % 2:
+        raise ValueError("checkerboard rows need an even number of columns, got %d" % m)
+    if out is None:
+        out = np.empty((n, m // 2), dtype=np.result_type(a, b))
+    # b is a scalar or one value per row, an (n, 1) view broadcasting along the row
+    b = np.asarray(b)
+    b_even, b_odd = (b, b) if b.ndim == 0 else (b.reshape(n, 1)[0::2], b.reshape(n, 1)[1::2])
+    even, odd = checker_cells(a)
+    np.multiply(even, b_even, out=out[0::2])
+    np.multiply(odd, b_odd, out=out[1::2])
+    return out
+
+
+def checker_multiply_add(a, b, noise, out=None):
+    # checker_multiply(a, b) + noise, the addition done in place
+    out = checker_multiply(a, b, out=out)
+    np.add(out, noise, out=out)
+    return out
+
+
+def normal_into(rng, out, loc=0.0, scale=1.0):
+    # np.random.normal(loc, scale, out.shape) drawn into an existing buffer
+    rng.standard_normal(dtype=out.dtype, out=out)
+    if scale != 1.0:
+        out *= scale
+    if loc != 0.0:
+        out += loc
+    return out
+
+
+# Benchmark: the 1intro.py expressions against the kernel at n x n
+
+def _expressions(a, b, noise):
+    c = a * b
+    d = c[c > 0].reshape(a.shape[0], a.shape[1] // 2)
+    return d + noise
+
+
+def _measure(func, *args):
+    # tracemalloc sees numpy's array buffers: peak is the temporary memory
+    # needed on top of the inputs (and the preallocated output)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+if __name__ == '__main__':
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10 ** 4
+    dtype = np.dtype(sys.argv[2]) if len(sys.argv) > 2 else np.dtype(np.float64)
+    n += n % 2
+    rng = np.random.default_rng(0)
+    a = checkerboard(n, n, dtype)
+    b = np.arange(5, 5 + n, dtype=dtype).reshape(n, 1)
+    noise = normal_into(rng, np.empty((n, n // 2), dtype=dtype), scale=0.1)
+    out = np.empty((n, n // 2), dtype=dtype)
+    unit = out.nbytes
+
+    expected, t_old, peak_old = _measure(_expressions, a, b, noise)
+    got, t_new, peak_new = _measure(checker_multiply_add, a, b, noise, out)
+    assert np.array_equal(expected, got)
+    del expected
+
+    print("%d x %d %s, memory in units of the (%d, %d) result (%.0f MB)" % (n, n, dtype, n, n // 2, unit / 1e6))
+    print("%-28s %10s %14s" % ('', 'time [s]', 'peak memory'))
+    print("%-28s %10.3f %13.2fx" % ('c = a*b; c[c>0]; d + noise', t_old, peak_old / unit))
+    print("%-28s %10.3f %13.2fx" % ('checker_multiply_add(out=)', t_new, peak_new / unit))
@@ -0,0 +1,200 @@
+import ast
+import importlib
+import os
+import re
+import subprocess
+import sys
+import time
+
+
+# Lazy imports
+#
+# tensorflow, matplotlib, scipy and sklearn each cost from a few hundred ms to
+# several seconds to import. A LazyModule stands in for the real module and only
+# imports it on the first attribute access, e.g.
+#
+#   plt = lazy_import('matplotlib.pyplot')   # nothing imported yet
+#   plt.plot(x)                              # matplotlib.pyplot imported here
+#
+# so code paths which only touch numpy never pay for the heavy packages.
+
+class LazyModule:
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self._name)
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return "<LazyModule %r (%s)>" % (self._name, state)
+
+
+def lazy_import(name):
+    # Already imported somewhere else, no reason to wrap it
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
+def lazy_attr(module_name, attr):
+    # For "from x import y" style imports: returns a callable which resolves
+    # x.y on first call, e.g. Sequential = lazy_attr('tensorflow.keras.models', 'Sequential')
+    module = lazy_import(module_name)
+
+    def resolve(*args, **kwargs):
+        return getattr(module, attr)(*args, **kwargs)
+
+    resolve.__name__ = attr
+    resolve.__qualname__ = attr
+    return resolve
+
+
+# Import time profiling
+#
+# python -X importtime writes one line per imported module on stderr:
+#   import time: self [us] | cumulative | imported package
+#   import time:       321 |        321 |   numpy.version
+# Indentation of the package name gives the nesting, the top level entries
+# (no indentation) are the ones the profiled statement imported directly.
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)')
+
+
+def import_profile(statement, top=20):
+    # Run the statement in a fresh interpreter so nothing is already cached
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append({
+                'module': module,
+                'depth': (len(indent) - 1) // 2,
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+            })
+    rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+    return rows[:top]
+
+
+def print_import_profile(statement, top=20):
+    rows = import_profile(statement, top)
+    print("Import profile for: %s" % statement)
+    print("%12s %12s  %s" % ('cumul [ms]', 'self [ms]', 'module'))
+    for row in rows:
+        print("%12.1f %12.1f  %s%s" % (
+            row['cumulative_ms'], row['self_ms'], '  ' * row['depth'], row['module']
+        ))
+
+
+def cold_start(statement, repeat=3):
+    # Best of `repeat` wall times (seconds) for running statement in a new interpreter
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], check=True, cwd=_HERE,
+                       capture_output=True, text=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+# Startup budget check: the scripts must not import the heavy packages at their
+# top level (only through lazy_import / lazy_attr), and importing what they do
+# import eagerly plus numpy-only work must stay under the budget (seconds).
+# The top level imports are read from the scripts themselves, so putting
+# "import matplotlib.pyplot" back at the top of 1intro.py fails the check.
+# Exits with a non zero status so it can be used as a regression check:
+#   python lazy.py [budget_seconds]
+
+HEAVY = ('tensorflow', 'matplotlib', 'scipy', 'sklearn')
+SCRIPTS = ('1intro.py', '4ml.py')
+
+
+def eager_imports(path):
+    # Modules imported at the top level of a script (also inside top level
+    # if/try/with blocks, not inside functions)
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    modules = []
+    pending = list(tree.body)
+    while pending:
+        node = pending.pop(0)
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+        elif isinstance(node, (ast.If, ast.Try, ast.With)):
+            pending.extend(ast.iter_child_nodes(node))
+        elif isinstance(node, ast.ExceptHandler):
+            pending.extend(node.body)
+    return modules
+
+
+NUMPY_ONLY_PATH = """
+import sys
+%s
+import numpy as np
+a = np.zeros((10, 10)); a[::2, ::2] = 1; a[1::2, 1::2] = 1
+heavy = [m for m in %r if m in sys.modules]
+assert not heavy, 'heavy modules imported eagerly: %%s' %% heavy
+"""
+
+
+def check_script(path):
+    # -> (heavy top level imports, statement timing the script's eager imports)
+    modules = list(dict.fromkeys(eager_imports(path)))
+    heavy = [m for m in modules if m.split('.')[0] in HEAVY]
+    statement = NUMPY_ONLY_PATH % ('\n'.join('import %s' % m for m in modules), HEAVY)
+    return heavy, statement
+
+
+if __name__ == '__main__':
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+
+    print_import_profile('import numpy')
+    print_import_profile('import matplotlib.pyplot, scipy, sklearn')
+
+    failed = []
+    for script in SCRIPTS:
+        heavy, statement = check_script(os.path.join(_HERE, script))
+        if heavy:
+            print("\n%s imports at top level: %s" % (script, ', '.join(heavy)))
+            failed.append(script)
+            continue
+        try:
+            elapsed = cold_start(statement)
+        except subprocess.CalledProcessError as e:
+            error = e.stderr.strip().splitlines()[-1] if e.stderr.strip() else 'exit status %d' % e.returncode
+            print("\n%s eager imports failed: %s" % (script, error))
+            failed.append(script)
+            continue
+        print("\n%s eager imports + numpy-only work: %.3fs (budget %.3fs)" % (script, elapsed, budget))
+        if elapsed > budget:
+            failed.append(script)
+    if failed:
+        sys.exit("cold start check failed: %s" % ', '.join(failed))
@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from serve import MicroBatcher, keras_predict, serve
+
+
+# Load test for serve.py
+#
+# Starts a local instance (the 1intro.py circles model, or --model), opens
+# --concurrency connections which each send single row requests one after the
+# other, and reports latency percentiles and throughput.
+#
+#   python loadtest.py --requests 20000 --concurrency 64
+#   python loadtest.py --max-batch 1          # same load without micro-batching
+#   python loadtest.py --port 8765            # against an already running serve.py
+
+
+def build_model(path=None):
+    if path:
+        from tensorflow.keras.models import load_model
+        return load_model(path)
+    from tensorflow.keras.layers import Dense
+    from tensorflow.keras.models import Sequential
+    model = Sequential()
+    model.add(Dense(4, input_shape=(2,), activation='tanh'))
+    model.add(Dense(1, activation='sigmoid'))
+    return model
+
+
+async def _client(port, rows, latencies):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for row in rows:
+        start = time.perf_counter()
+        writer.write(json.dumps(row.tolist()).encode() + b'\n')
+        await writer.drain()
+        reply = json.loads(await reader.readline())
+        if isinstance(reply, dict):
+            raise RuntimeError(reply['error'])
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def run(args):
+    batcher, server = None, None
+    port = args.port
+    if port is None:
+        model = build_model(args.model)
+        batcher = await MicroBatcher(keras_predict(model), args.max_batch, args.max_delay,
+                                     n_features=args.features).start()
+        server = await serve(batcher, port=0)
+        port = server.sockets[0].getsockname()[1]
+
+    X = np.random.default_rng(0).normal(size=(args.requests, args.features)).astype(np.float32)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _client(port, X[i::args.concurrency], latencies) for i in range(args.concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    print("requests     %d (concurrency %d)" % (len(ms), args.concurrency))
+    print("throughput   %.0f req/sec" % (len(ms) / elapsed))
+    print("latency p50  %.2f ms" % np.percentile(ms, 50))
+    print("latency p99  %.2f ms" % np.percentile(ms, 99))
+    if batcher is not None:
+        print("batches      %d (%.1f rows per batch)" % (batcher.batches, batcher.rows / max(batcher.batches, 1)))
+        server.close()
+        await server.wait_closed()
+        await batcher.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load test for the micro-batching prediction server")
+    parser.add_argument('--model', help='saved keras model, default: untrained 1intro.py circles model')
+    parser.add_argument('--features', type=int, default=2)
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-delay', type=float, default=0.002, help='seconds')
+    parser.add_argument('--port', type=int, help='test a running serve.py instead of a local one')
+    asyncio.run(run(parser.parse_args()))
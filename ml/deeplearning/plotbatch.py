@@ -0,0 +1,272 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from decimate import minmax_indices
+
+
+# Headless batch renderer for the 2pandas.py chart suite
+#
+# df.plot(kind=...) re-scans the whole frame for every chart. Here every column
+# is sorted once and all the aggregations the charts need are read off the
+# sorted copy:
+#   - histogram / cumulative histogram counts: searchsorted of the bin edges
+#   - box plot quartiles, whiskers and outliers: positions in the sorted array
+#   - pie counts (values above a threshold): one searchsorted
+# Hexbin counts are computed once for the (x, y) pair of columns named with
+# hexbin=(x, y), and only the occupied hexagon centers are handed to matplotlib.
+# Options like hexbin or pie can be given per segment, see render_batch.
+#
+# Segments are rendered in a process pool on the Agg backend, each worker keeps
+# its figures alive and only clears the axes between charts.
+
+CHARTS = ('line', 'scatter', 'hist', 'cumhist', 'box', 'grid', 'pie', 'hexbin')
+
+
+def _quantile(s, q):
+    # Linear interpolation on an already sorted array (same as np.percentile)
+    pos = q * (len(s) - 1)
+    lo = int(np.floor(pos))
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (pos - lo)
+
+
+def _bin_counts(s, edges):
+    idx = np.searchsorted(s, edges, side='left')
+    idx[-1] = len(s)    # last bin is closed on the right, like np.histogram
+    return np.diff(idx)
+
+
+def _box_stats(s, label):
+    q1, med, q3 = _quantile(s, 0.25), _quantile(s, 0.5), _quantile(s, 0.75)
+    iqr = q3 - q1
+    lo = np.searchsorted(s, q1 - 1.5 * iqr, side='left')
+    hi = np.searchsorted(s, q3 + 1.5 * iqr, side='right')
+    return {
+        'label': label, 'q1': q1, 'med': med, 'q3': q3,
+        'whislo': s[lo], 'whishi': s[hi - 1],
+        'fliers': np.concatenate([s[:lo], s[hi:]]),
+    }
+
+
+def hexbin_counts(x, y, gridsize=100):
+    # Same two-lattice binning matplotlib's hexbin does, returns the centers of
+    # the occupied hexagons with their counts and the extent used
+    xmin, xmax, ymin, ymax = x.min(), x.max(), y.min(), y.max()
+    nx = gridsize
+    ny = int(nx / np.sqrt(3))
+    sx = (xmax - xmin) / nx
+    sy = (ymax - ymin) / ny
+    ix = (x - xmin) / sx
+    iy = (y - ymin) / sy
+    ix1, iy1 = np.round(ix), np.round(iy)
+    ix2, iy2 = np.floor(ix), np.floor(iy)
+    d1 = (ix - ix1) ** 2 + 3.0 * (iy - iy1) ** 2
+    d2 = (ix - ix2 - 0.5) ** 2 + 3.0 * (iy - iy2 - 0.5) ** 2
+    first = d1 < d2
+    cx = np.where(first, xmin + ix1 * sx, xmin + (ix2 + 0.5) * sx)
+    cy = np.where(first, ymin + iy1 * sy, ymin + (iy2 + 0.5) * sy)
+    centers, counts = np.unique(np.stack([cx, cy], axis=1), axis=0, return_counts=True)
+    return centers[:, 0], centers[:, 1], counts, (xmin, xmax, ymin, ymax)
+
+
+def segment_stats(columns, values, bins=50, cumulative_bins=100,
+                  pie=('data1', 0.1), hexbin=None, gridsize=100):
+    # One sort per column, everything else is derived from the sorted copies
+    stats = {'columns': list(columns), 'values': values}
+    sorted_cols = []
+    for i in range(values.shape[1]):
+        col = values[:, i]
+        sorted_cols.append(np.sort(col[~np.isnan(col)]))
+
+    # all NaN columns have no range, no quartiles: they get empty bins and no box
+    filled = [s for s in sorted_cols if len(s)]
+    lo = min((s[0] for s in filled), default=0.0)
+    hi = max((s[-1] for s in filled), default=1.0)
+    # Bins are shared by all columns, as df.plot(kind='hist') does
+    edges = np.linspace(lo, hi, bins + 1)
+    cum_edges = np.linspace(lo, hi, cumulative_bins + 1)
+    stats['hist'] = (edges, [_bin_counts(s, edges) for s in sorted_cols])
+    stats['cumhist'] = (cum_edges, [np.cumsum(_bin_counts(s, cum_edges)) / max(len(s), 1)
+                                    for s in sorted_cols])
+    stats['box'] = [_box_stats(s, name) for s, name in zip(sorted_cols, columns) if len(s)]
+
+    if pie and pie[0] in columns:
+        s = sorted_cols[columns.index(pie[0])]
+        above = len(s) - np.searchsorted(s, pie[1], side='right')
+        stats['pie'] = (pie[1], np.array([len(s) - above, above]))
+
+    if hexbin:
+        x = values[:, columns.index(hexbin[0])]
+        y = values[:, columns.index(hexbin[1])]
+        both = ~(np.isnan(x) | np.isnan(y))
+        if both.any():
+            stats['hexbin'] = hexbin_counts(x[both], y[both], gridsize) + (gridsize,)
+    return stats
+
+
+# Drawing from the precomputed stats
+
+def _draw_line(ax, stats, title='Line plot', style='-'):
+    # Only the min/max of every pixel column is drawn, see decimate.py
+    values = stats['values']
+    width = int(ax.bbox.width)
+    for i, name in enumerate(stats['columns']):
+        idx = minmax_indices(values[:, i], width)
+        ax.plot(idx, values[idx, i], style, label=name)
+    ax.legend(loc='best')
+    ax.set_title(title)
+
+
+def _draw_points(ax, stats, title='Scatter Plot', style='.'):
+    # Every point: min/max decimation is only lossless for connected lines, it
+    # would drop all the markers between each pixel column's min and max
+    values = stats['values']
+    for i, name in enumerate(stats['columns']):
+        ax.plot(values[:, i], style, label=name)
+    ax.legend(loc='best')
+    ax.set_title(title)
+
+
+def _draw_scatter(ax, stats):
+    _draw_points(ax, stats)
+
+
+def _draw_hist(ax, stats):
+    edges, counts = stats['hist']
+    for c, name in zip(counts, stats['columns']):
+        ax.stairs(c, edges, fill=True, alpha=0.6, label=name)
+    ax.legend(loc='best')
+    ax.set_title('Histogram')
+
+
+def _draw_cumhist(ax, stats):
+    edges, fractions = stats['cumhist']
+    for f, name in zip(fractions, stats['columns']):
+        ax.stairs(f, edges, fill=True, alpha=0.4, label=name)
+    ax.legend(loc='best')
+    ax.set_title('Cumulative distributions')
+
+
+def _draw_box(ax, stats):
+    ax.bxp(stats['box'])
+    ax.set_title('Boxplot')
+
+
+def _draw_pie(ax, stats):
+    threshold, counts = stats['pie']
+    ax.pie(counts, explode=[0, 0.15], labels=['<= %s' % threshold, '> %s' % threshold],
+           autopct='%1.1f%%', shadow=True, startangle=90, textprops={'fontsize': 16})
+    ax.set_title('Pie chart')
+
+
+def _draw_hexbin(ax, stats):
+    cx, cy, counts, extent, gridsize = stats['hexbin']
+    ax.hexbin(cx, cy, C=counts, gridsize=gridsize, extent=extent,
+              reduce_C_function=np.sum, cmap='rainbow')
+    ax.set_title('Hexbin Plot')
+
+
+_DRAW = {
+    'line': _draw_line,
+    'scatter': _draw_scatter,
+    'hist': _draw_hist,
+    'cumhist': _draw_cumhist,
+    'box': _draw_box,
+    'pie': _draw_pie,
+    'hexbin': _draw_hexbin,
+}
+
+
+# Worker side: figures are created once per process and reused
+
+_FIGURES = {}
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _figure(layout):
+    fig = _FIGURES.get(layout)
+    if fig is None:
+        import matplotlib.pyplot as plt
+        rows, cols = layout
+        size = (16, 12) if layout == (2, 2) else (10, 6)
+        fig, _ = plt.subplots(rows, cols, figsize=size)
+        _FIGURES[layout] = fig
+    for ax in fig.axes:
+        ax.clear()
+    return fig
+
+
+def render_segment(name, columns, values, out_dir, charts=CHARTS, dpi=80, **stats_options):
+    stats = segment_stats(columns, values, **stats_options)
+    seg_dir = os.path.join(out_dir, name)
+    os.makedirs(seg_dir, exist_ok=True)
+
+    rendered = 0
+    for chart in charts:
+        if chart in ('pie', 'hexbin') and chart not in stats:
+            continue
+        if chart == 'grid':
+            fig = _figure((2, 2))
+            ax = fig.axes
+            _draw_line(ax[0], stats)
+            _draw_points(ax[1], stats, title='Scatter plot', style='o')
+            _draw_hist(ax[2], stats)
+            _draw_box(ax[3], stats)
+        else:
+            fig = _figure((1, 1))
+            _DRAW[chart](fig.axes[0], stats)
+        fig.savefig(os.path.join(seg_dir, chart + '.png'), dpi=dpi)
+        rendered += 1
+    return rendered
+
+
+def render_batch(segments, out_dir, charts=CHARTS, workers=None, **stats_options):
+    # segments: iterable of (name, DataFrame) or (name, DataFrame, options), the
+    # options override stats_options for that segment, e.g. {'hexbin': ('x', 'y')}.
+    # Only the column names and the float values are shipped to the workers, not
+    # the frame itself.
+    start = time.perf_counter()
+    total = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = []
+        for name, df, *options in segments:
+            segment_options = dict(stats_options, **(options[0] if options else {}))
+            futures.append(pool.submit(render_segment, name, list(df.columns),
+                                       df.to_numpy(dtype=np.float64), out_dir, charts,
+                                       **segment_options))
+        for future in futures:
+            total += future.result()
+    elapsed = time.perf_counter() - start
+    return {'charts': total, 'seconds': elapsed, 'charts_per_sec': total / elapsed}
+
+
+if __name__ == '__main__':
+    import tempfile
+    import pandas as pd
+
+    n_segments = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    N = 1000
+    rng = np.random.default_rng(0)
+
+    def segment(i):
+        data = np.column_stack([
+            rng.normal(0, 0.1, N),
+            rng.normal(1, 0.4, N) + np.linspace(0, 1, N),
+            2 + (rng.random(N) + np.linspace(1, 5, N)),
+            2 + (rng.random(N) * np.linspace(1, 5, N)),
+            rng.normal(3, 0.2, N) + 0.3 * np.sin(np.linspace(0, 20, N)),
+        ])
+        frame = pd.DataFrame(data, columns=['data1', 'data2', 'data3', 'data4', 'data5'])
+        return 'segment-%05d' % i, frame, {'hexbin': ('data1', 'data2')}
+
+    with tempfile.TemporaryDirectory() as out:
+        report = render_batch((segment(i) for i in range(n_segments)), out)
+    print("%(charts)d charts in %(seconds).2fs: %(charts_per_sec).1f charts/sec" % report)
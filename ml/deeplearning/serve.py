@@ -0,0 +1,159 @@
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+# Micro-batching prediction service
+#
+# model.predict(X) on one row costs about the same as on a hundred: the overhead
+# is per call, not per row. MicroBatcher queues the incoming single row requests,
+# takes up to max_batch of them (or whatever arrived within max_delay seconds of
+# the first one), runs one predict for the whole batch and resolves every
+# caller's future with its own row of the result.
+#
+# The model runs in one background thread, so the event loop keeps accepting
+# (and batching) requests while a batch is predicted.
+#
+# Every row of a batch must have the same shape (n_features values, or the
+# shape of the first row received if n_features isn't given): a malformed
+# request is rejected in predict() before it is queued, so it can't fail the
+# np.stack of the batch for everybody else in it.
+#
+# serve() exposes a batcher over TCP, one json request per line:
+#   -> [0.3, -1.2]
+#   <- [0.87]
+#
+#   python serve.py model.keras 8765
+
+
+def keras_predict(model):
+    # predict_on_batch skips the per call setup predict() does (callbacks,
+    # dataset creation), which dominates for small batches
+    def predict(X):
+        return np.asarray(model.predict_on_batch(X))
+    return predict
+
+
+class MicroBatcher:
+    def __init__(self, predict, max_batch=64, max_delay=0.002, n_features=None):
+        self._predict = predict
+        # n_features: values per row, or the full row shape as a tuple
+        self.row_shape = None if n_features is None else tuple(int(d) for d in np.atleast_1d(n_features))
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._task = None
+        self.batches = 0
+        self.rows = 0
+
+    async def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _check(self, x):
+        if self.row_shape is None:
+            self.row_shape = x.shape
+        elif x.shape != self.row_shape:
+            raise ValueError("expected a row of shape %s, got %s" % (self.row_shape, x.shape))
+
+    async def predict(self, x):
+        x = np.asarray(x)
+        self._check(x)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((x, future))
+        return await future
+
+    async def _next_batch(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.max_batch:
+            # take everything already queued, then wait for more until the deadline
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            batch = [(x, f) for x, f in batch if not f.cancelled()]
+            if not batch:
+                continue
+            try:
+                X = np.stack([x for x, _ in batch])
+                y = await loop.run_in_executor(self._executor, self._predict, X)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.rows += len(batch)
+            for i, (_, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result(y[i])
+
+
+async def serve(batcher, host='127.0.0.1', port=8765):
+    async def handle(reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    y = await batcher.predict(np.asarray(json.loads(line), dtype=np.float32))
+                    reply = json.dumps(np.asarray(y).tolist())
+                except Exception as e:
+                    reply = json.dumps({'error': str(e)})
+                writer.write(reply.encode() + b'\n')
+                await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def _main(model_path, port):
+    from tensorflow.keras.models import load_model
+    model = load_model(model_path)
+    row_shape = tuple(model.input_shape[1:]) if hasattr(model, 'input_shape') else None
+    if row_shape is not None and None in row_shape:
+        row_shape = None    # variable sized inputs: checked against the first row instead
+    async with MicroBatcher(keras_predict(model), n_features=row_shape) as batcher:
+        server = await serve(batcher, port=port)
+        print("serving %s on 127.0.0.1:%d" % (model_path, port))
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == '__main__':
+    asyncio.run(_main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 8765))
@@ -14,25 +14,42 @@ print(df0)
 # dataframes assign an auto-increment index to each row
 
 # Adding a row - new dataframe is generated
-df0 = df0.append(
-    pd.Series(['Aniket', 'Python', 34], index=['name', 'language', 'age']),
+# (DataFrame.append was removed in pandas 2, pd.concat with a one row frame does the same)
+df0 = pd.concat(
+    [df0, pd.DataFrame([['Aniket', 'Python', 34]], columns=['name', 'language', 'age'])],
     ignore_index=True
 )
-# ignore_index=True, means add the series with a auto-increment row-index
+# ignore_index=True, means add the row with a auto-increment row-index
 
 print(df0)
 
-df0 = df0.append(
-    pd.Series(
-        ['Rakesh', 'Javascript', 31, 'Design'],
-        index=['name', 'language', 'age', 'department']
-    ),
+df0 = pd.concat(
+    [df0, pd.DataFrame(
+        [['Rakesh', 'Javascript', 31, 'Design']],
+        columns=['name', 'language', 'age', 'department']
+    )],
     ignore_index=True
 )
 # add a department column to dataframe, makes it NaN for previous entries
 
 print(df0)
 
+# Every append/concat copies the whole dataframe, so adding n rows one by one is O(n^2).
+# When rows arrive one at a time, collect them first and create the dataframe once.
+# RowBuilder (rowbuilder.py) keeps a growable array per column and back-fills NaN
+# for columns which show up later, like department here
+from rowbuilder import RowBuilder
+
+rows = RowBuilder()
+rows.append({'name': 'Devendra', 'language': 'Javascript', 'age': 37})
+rows.append({'name': 'Aniket', 'language': 'Python', 'age': 34})
+rows.append({'name': 'Rakesh', 'language': 'Javascript', 'age': 31, 'department': 'Design'})
+print(rows.to_frame())
+#       name    language  age department
+#0  Devendra  Javascript   37        NaN
+#1    Aniket      Python   34        NaN
+#2    Rakesh  Javascript   31     Design
+
 # To understand nuisances for ignore_index check the link
 # https://stackoverflow.com/questions/32801806/pandas-concat-ignore-index-doesnt-work
 
@@ -87,6 +104,13 @@ pd.concat([df1, df2], ignore_index=True)
 #6  NaN   A6  NaN   C6  NaN   D6
 #7  NaN   A7  NaN   C7  NaN   D7
 
+# Concatenating many frames with different columns (e.g. thousands of daily files)
+# makes pandas union the columns and NaN-fill for every frame.
+# planned_concat (concatplan.py) looks at all the schemas first, allocates the
+# final columns once and copies each frame into place once, same result:
+from concatplan import planned_concat
+planned_concat([df1, df2], ignore_index=True)
+
 df1.reset_index(drop=True, inplace=True)  # redo indexes
 df2.reset_index(drop=True, inplace=True)  # redo indexes
 
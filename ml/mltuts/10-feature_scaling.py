@@ -76,3 +76,16 @@ sum([i for i in map(lambda x: x*x,  x1norm[2, :])])   # 1.0
 
 binarize = preprocessing.Binarizer(threshold=4)
 print(binarize.fit_transform(x))
+
+# ---------------------------------
+# Precision: numpy and pandas default to float64. precision.py keeps features in
+# float32 (half the memory) while means, variances and sums are accumulated in float64,
+# so the scaled values match sklearn's to float32 accuracy
+import precision
+
+xf = precision.as_features(x1 / 1.0)             # float32 (an int array would only be downcast)
+print(precision.standard_scale(xf))              # same as std_scaler.fit_transform(x1)
+print(precision.minmax_scale(xf, (0, 1)))
+print(precision.normalize(xf))
+with precision.policy(features='float64'):       # back to float64 for a block
+    print(precision.standard_scale(x1).dtype)    # float64
@@ -1,5 +1,7 @@
 import pandas as pd
 
+from instrument import stage
+
 
 # Create a dataframe from titanic.csv dataset
 df = pd.read_csv("data/titanic.csv")
@@ -55,6 +57,13 @@ print(df[(df['Age'] > 43) & (df['Sex'] == 'male')])
 # Add a new column based on old columns
 df['Class Type'] = df['Pclass'].replace(1, 'First').replace(2, 'Second').replace(3, 'Third')
 
+# Each replace above is a full pass over the column and creates a column of python strings.
+# CodeMap (codemap.py) maps all codes in one vectorized lookup and returns a
+# categorical column (a small int per row), default= labels values not in the dict
+from codemap import CodeMap
+class_type = CodeMap({1: 'First', 2: 'Second', 3: 'Third'}, default='Unknown')
+df['Class Type'] = class_type(df['Pclass'])
+
 # Rename columns
 df = df.rename(columns={'Sex': 'Gender'})
 
@@ -102,6 +111,26 @@ rows_removed_1 = df1.drop(['60', '40.5', '30.5'], axis=0)
 # drop all males
 females_only = df.drop(df[df['Gender'] == 'male'].index, axis=0)
 
+# Each step above (filter, column selection, drop, sort) copies the dataframe.
+# LazyFrame (lazyframe.py) records the steps and runs them in one pass: filters
+# and column selection are applied while reading the csv, sort + head is a top-k
+from lazyframe import LazyFrame, col
+
+youngest_females = (
+    LazyFrame.scan_csv("data/titanic.csv")
+    .drop_where(col('Sex') == 'male')
+    .select(['Name', 'Age', 'Pclass', 'Fare'])
+    .sort('Age')
+    .head(10)
+)
+youngest_females.explain()
+# Optimized plan:
+#   Scan csv 'data/titanic.csv' usecols=['Name', 'Age', 'Pclass', 'Fare', 'Sex'] chunksize=100000
+#     Filter ~(Sex == 'male')  (pushed into scan)
+#   TopK 10 by ['Age'] ascending=True  (per chunk)
+#   Project ['Name', 'Age', 'Pclass', 'Fare']
+print(youngest_females.collect())
+
 # Identify duplicates
 # Find data where age < 20 and age,gender,Pclass,Fare are duplicated
 # keep={'first', 'last', False}
@@ -111,14 +140,28 @@ females_only = df.drop(df[df['Gender'] == 'male'].index, axis=0)
 duplicate_ages = df[(df['Age'] < 20) & (df.duplicated(['Age', 'Gender', 'Pclass', 'Fare'], keep=False))][['Name', 'Age', 'Gender', 'Pclass', 'Fare']].sort_values(by=['Age'])
 # also supports inplace as a parameter, which mutated the df itself
 
+# duplicated() compares tuples of python objects. dedup.py hashes the key columns
+# into one 64-bit fingerprint per row instead (same keep= semantics), and
+# StreamDeduper does it across chunks, e.g. for logs too big to load at once
+import dedup
+duplicate_ages = df[(df['Age'] < 20) & dedup.duplicated(df, ['Age', 'Gender', 'Pclass', 'Fare'], keep=False)][['Name', 'Age', 'Gender', 'Pclass', 'Fare']].sort_values(by=['Age'])
+# for chunk in dedup.dedup_csv("data/titanic.csv", ['Age', 'Sex', 'Pclass', 'Fare'], chunksize=100):
+#     print(len(chunk))
+
 
 # Group By
 
 # Group by Sex and find mean of ALL number columns
-mean_by_sex = df.groupby('Sex').mean()
+with stage('groupby') as s:
+    s.rows_in = len(df)
+    mean_by_sex = df.groupby('Sex').mean()
 
-mean_by_sex_of_age = df.groupby('Sex')['Age'].mean()
-print("Male mean age = ", mean_by_sex_of_age['male'])
+    mean_by_sex_of_age = df.groupby('Sex')['Age'].mean()
+    print("Male mean age = ", mean_by_sex_of_age['male'])
 
-mean_by_sex_survived_of_age = df.groupby(['Sex', 'Survived'])['Age'].mean()
+    mean_by_sex_survived_of_age = df.groupby(['Sex', 'Survived'])['Age'].mean()
 print("Survived Male mean age = ", mean_by_sex_of_age['male'][0])
+
+import instrument
+if instrument.enabled():    # ML_TRACE=1, see instrument.py
+    instrument.summary()
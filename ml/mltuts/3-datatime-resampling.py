@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 
+from instrument import stage
+
 # Create a timeseries data
 
 # Create a time series array. Start as 01/01/2018, 2000000 data points at a
@@ -18,7 +20,8 @@ df['NumberOfVehicles'] = np.random.randint(0, 20, 200000)  # 2000000 pts between
 # Since the INDEX is timeseries, we can do timeseries calculation
 
 # Sum by grouping/sampling weeks data together
-df.resample('W').sum()
+with stage('resample W'):
+    df.resample('W').sum()
 
 # resample by default does it on index, if the column wasn't index, we use:
 # df.resample('W', on='NumberOfVehicles').sum()
@@ -27,7 +30,8 @@ df.resample('W').sum()
 df.resample('2W').sum()
 
 # Sum by grouping/sampling monthly data together
-df.resample('M').sum()
+with stage('resample M'):
+    df.resample('M').sum()
 # Output
 #2018-01-31            424438
 #2018-02-28            380936
@@ -49,17 +53,23 @@ df.resample('M', label='left').sum()
 df['DateTime'] = df.index
 
 # Adding new datetime fields to the dataframe
-df['Year'] = df['DateTime'].dt.year
-# If you want to use the index column, use
-# df['Year'] = df.index.year
+with stage('datetime fields') as s:
+    s.rows_in = len(df)
+    df['Year'] = df['DateTime'].dt.year
+    # If you want to use the index column, use
+    # df['Year'] = df.index.year
 
-df['Month'] = df.DateTime.dt.month
+    df['Month'] = df.DateTime.dt.month
 
-df['Day'] = df.DateTime.dt.day
+    df['Day'] = df.DateTime.dt.day
 
-df['WeekDay'] = df.DateTime.dt.weekday_name
+    df['WeekDay'] = df.DateTime.dt.weekday_name
 # Output
 #                     NumberOfVehicles            DateTime  ...  Day   WeekDay
 #2018-01-01 00:00:00                18 2018-01-01 00:00:00  ...    1    Monday
 #2018-01-01 00:01:00                 2 2018-01-01 00:01:00  ...    1    Monday
-#2018-01-01 00:02:00                10 2018-01-01 00:02:00  ...    1    Monday
\ No newline at end of file
+#2018-01-01 00:02:00                10 2018-01-01 00:02:00  ...    1    Monday
+
+import instrument
+if instrument.enabled():    # ML_TRACE=1, see instrument.py
+    instrument.summary()
@@ -16,6 +16,22 @@ df['CleanName'] = df['Name'].apply(lambda x: x.upper())
 # Lambda on all rows
 df["Name_Sex"] = df.apply(lambda row: row["Name"] + " - " + str(row["Sex"]), axis = 1)
 
+# apply(axis=1) runs on one core and creates a Series for every row. When the
+# function can't be vectorized (e.g. regex parsing), parallel_apply (parallel_apply.py)
+# runs it on chunks of rows in a process pool, only the columns it needs are
+# shared with the workers. The function gets itertuples rows: row.Name, not row["Name"]
+import re
+from parallel_apply import parallel_apply
+
+title_regex = re.compile(r',\s*([^.]+)\.')
+
+def title(row):
+    match = title_regex.search(row.Name)
+    return match.group(1) if match else None
+
+df["Title"] = parallel_apply(df, title, columns=["Name"])   # Mr, Mrs, Miss, Master...
+# 891 rows is below min_rows, so this one runs serially
+
 for cols in df:
     print(cols)
 
@@ -1,7 +1,11 @@
 import pandas as pd
 
+from instrument import stage
+
 # Load data with missing values
-df = pd.read_csv("data/missing.csv")
+with stage('load') as s:
+    df = pd.read_csv("data/missing.csv")
+    s.rows_out = len(df)
 #   Country   Age  Gender  ... Employement Type   Salary Purchased
 #0   Poland  34.0    Male  ...        Permanent  72000.0        No
 #1    Spain  42.0  Female  ...        Temporary  48000.0       Yes
@@ -29,6 +33,15 @@ row_without_missing_values = df.dropna(axis=0)
 
 names_of_cols_with_missing_values = [col for col in df if df[col].isnull().any()]
 
+# Each of the above goes over the whole dataframe again. profile() (profiler.py)
+# reads the file once, in chunks, and reports null counts, distinct values,
+# min/max and the most frequent values of every column
+from profiler import profile
+print(profile("data/missing.csv"))
+#                     dtype  rows  nulls  null_pct  distinct  ...  top
+#Country             object    20      0       0.0         6  ...  Germany:5, Spain:5, Poland:4
+#Age                float64    20      3      15.0         9  ...
+
 # Imputer strategy to deal with NaN
 
 # Data fitting to fill-in missing values
@@ -51,7 +64,8 @@ imputer = Imputer(missing_values='NaN', strategy='mean', axis=0)
 imputer.fit(features[:, [1,6]])    # strategy is mean, so will only with numbers
 
 # replace features with the transformed values
-features[:, [1, 6]] = imputer.fit_transform(features[:, [1, 6]])
+with stage('impute numeric'):
+    features[:, [1, 6]] = imputer.fit_transform(features[:, [1, 6]])
 
 # Create dataframe from array of features
 missing_values_replaced_by_mean = pd.DataFrame(features)
@@ -67,7 +81,8 @@ df.mode()
 #2      NaN   NaN    NaN  ...              NaN  54000.0       NaN
 
 # Replace all NAs with max-frequency label
-df[cols] = df[cols].fillna(df.mode().iloc[0])
+with stage('impute categorical'):
+    df[cols] = df[cols].fillna(df.mode().iloc[0])
 
 
 # -------------------------------------------------------------------
@@ -90,8 +105,9 @@ pd.DataFrame(features)
 #2   2   29    Male  Business   No      Temporary  54000
 #3   5   38    Male  Business   No      Permanent  61000
 
-for col in [2, 3, 4, 5]:
-    features[:, col] = encode.fit_transform(features[:, col])
+with stage('label encode'):
+    for col in [2, 3, 4, 5]:
+        features[:, col] = encode.fit_transform(features[:, col])
     
 pd.DataFrame(features)
 #    0    1  2  3  4  5      6
@@ -101,4 +117,8 @@ pd.DataFrame(features)
 #3   5   38  1  0  0  0  61000
 
 # Label encoder will make text-categories into enums, this if treated as numbers
-# will lead to data weightage issues. So, we need to use another technique
\ No newline at end of file
+# will lead to data weightage issues. So, we need to use another technique
+
+import instrument
+if instrument.enabled():    # ML_TRACE=1, see instrument.py
+    instrument.summary()
@@ -1,8 +1,12 @@
 import pandas as pd
 from sklearn.preprocessing import Imputer
 
+from instrument import stage
+
 # Read the dataframe
-df = pd.read_csv("data/missing.csv")
+with stage('load') as s:
+    df = pd.read_csv("data/missing.csv")
+    s.rows_out = len(df)
 
 # Use imputer to replace missing values with mean of the column
 features = df.iloc[:, :-1].values  # All rows, all but last column  (20 x 7)
@@ -57,4 +61,11 @@ ct = ColumnTransformer([
 # 0(1), 0(2), 0(3), 0(4), 0(5), 0(6), 5(0), 5(1), 1, 2, 3, 4
 
 
-features = ct.fit_transform(features)
\ No newline at end of file
+with stage('one hot encode') as s:
+    s.rows_in = len(features)
+    features = ct.fit_transform(features)
+    s.rows_out = features.shape[0]
+
+import instrument
+if instrument.enabled():    # ML_TRACE=1, see instrument.py
+    instrument.summary()
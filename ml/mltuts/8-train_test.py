@@ -1,44 +1,76 @@
 import pandas as pd
 from sklearn.preprocessing import Imputer
 
+from instrument import stage
+
+# Each step is wrapped in a stage(), run with ML_TRACE=1 to see how long each
+# took and how much memory it needed (see instrument.py), without ML_TRACE the
+# stages cost nothing
+
 # Read the dataframe and clean up the data (missing values and encoding)
-df = pd.read_csv("data/missing.csv")
+with stage('load') as s:
+    df = pd.read_csv("data/missing.csv")
+    s.rows_out = len(df)
 
 # Use imputer to replace missing values with mean of the column
-features = df.iloc[:, :-1].values  # All rows, all but last column  (20 x 7)
-labels = df.iloc[:, -1].values     # Last column values             (20 x 1)
-imputer = Imputer(missing_values='NaN', strategy='mean', axis=0)
-features[:, [1, 6]] = imputer.fit_transform(features[:, [1, 6]])
+with stage('impute') as s:
+    s.rows_in = len(df)
+    features = df.iloc[:, :-1].values  # All rows, all but last column  (20 x 7)
+    labels = df.iloc[:, -1].values     # Last column values             (20 x 1)
+    imputer = Imputer(missing_values='NaN', strategy='mean', axis=0)
+    features[:, [1, 6]] = imputer.fit_transform(features[:, [1, 6]])
 
-# Fill missing pieces of categorical information by higest frequency category
-df = pd.DataFrame(features, columns=df.columns[:-1])
-cols = ['Occupation', 'Employment Status', 'Employement Type']
-df[cols] = df[cols].fillna(df.mode().iloc[0])
+    # Fill missing pieces of categorical information by higest frequency category
+    df = pd.DataFrame(features, columns=df.columns[:-1])
+    cols = ['Occupation', 'Employment Status', 'Employement Type']
+    df[cols] = df[cols].fillna(df.mode().iloc[0])
+    s.rows_out = len(df)
 
 
 # One hot encoding
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder
 
-features = df.iloc[:, :-1]. values
+with stage('encode') as s:
+    s.rows_in = len(df)
+    features = df.iloc[:, :-1]. values
 
-ct = ColumnTransformer([
-    ('hotencoder', OneHotEncoder(), [0, 5])
-], remainder="passthrough")
+    ct = ColumnTransformer([
+        ('hotencoder', OneHotEncoder(), [0, 5])
+    ], remainder="passthrough")
 
-features = ct.fit_transform(features)
+    features = ct.fit_transform(features)
+    s.rows_out = features.shape[0]
 
 # We not have features and labels, we need to train using a training set
 
 from sklearn.model_selection import train_test_split
 
-X_train, X_test, y_train, y_test = train_test_split(
-    features,
-    labels,
-    test_size=0.25,     # Percentage of data to use as training set
-    random_state=0,     # Seed used by random number generator
-)
+with stage('split') as s:
+    s.rows_in = features.shape[0]
+    X_train, X_test, y_train, y_test = train_test_split(
+        features,
+        labels,
+        test_size=0.25,     # Percentage of data to use as training set
+        random_state=0,     # Seed used by random number generator
+    )
+    s.rows_out = X_train.shape[0]
 
 # features.shape    (20, 13)            labels.shape    (20, )
 # X_test.shape      (5, 13)             y_test.shape    (5, )
-# X_train.shape     (15, 13)            y_train.shape   (15, )
\ No newline at end of file
+# X_train.shape     (15, 13)            y_train.shape   (15, )
+
+# One split wastes data and the score depends on which rows landed in the test set.
+# k-fold cross validation trains on k - 1 blocks and tests on the last one, k times.
+# cv.py does it without refitting the imputer and encoder per fold (their means,
+# modes and vocabularies are combined from per block statistics) and keeps the fold
+# matrices to compare several models:
+# from cv import CrossValidator
+# cv = CrossValidator(pd.read_csv("data/missing.csv"), target='Purchased', numeric=['Age', 'Salary'],
+#                     categorical=['Country', 'Occupation', 'Employment Status', 'Employement Type'], k=5)
+# cv.evaluate(LogisticRegression)       # accuracy of each of the 5 folds
+
+import instrument
+if instrument.enabled():
+    instrument.summary()
+    instrument.export_chrome_trace('train_test.trace.json')   # open in chrome://tracing or speedscope
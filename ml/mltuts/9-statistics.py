@@ -48,6 +48,18 @@ np.percentile(matrix, 25, axis=1)
 # array([1.5, 4.5, 7.5])
 # 25th percentile across axis 1 (X)
 
+# Same statistics under the precision policy (precision.py): the int matrix is
+# stored as int8 (ints are downcast, not rounded to float32), float matrices as
+# float32 (the default feature dtype); the sums behind mean and variance are
+# accumulated in float64
+import precision
+features = precision.as_features(matrix)     # int8
+precision.mean(features)                # 5.0
+precision.var(features)                 # 6.666666666666667 (a float64 scalar)
+precision.percentile(features, 25, axis=0)
+with precision.policy(features='float64'):
+    precision.as_features(matrix / 1.0).dtype   # float64
+
 from scipy import stats
 
 matrix = np.array([
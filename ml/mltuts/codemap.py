@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+
+# Mapping codes to labels in one pass
+#
+# s.replace(1, 'First').replace(2, 'Second').replace(3, 'Third') scans the column
+# once per replace and allocates an object (python string pointer) column each time.
+# CodeMap compiles the {value: label} dict once:
+#   - the labels become the categories of a Categorical
+#   - small integer keys get a dense lookup array, key -> category code, so mapping
+#     a column is one vectorized gather (lut[values - min_key])
+#   - any other keys are looked up with a hash index (Index.get_indexer)
+# The result is a categorical column: per row a small int code instead of a
+# pointer to a python string.
+#
+#   class_type = CodeMap({1: 'First', 2: 'Second', 3: 'Third'})
+#   df['Class Type'] = class_type(df['Pclass'])
+
+_MAX_DENSE_RANGE = 1 << 20
+
+
+class CodeMap:
+    def __init__(self, mapping, default=None):
+        labels = list(dict.fromkeys(mapping.values()))
+        if default is not None and default not in labels:
+            labels.append(default)
+        self.categories = pd.Index(labels)
+        self.default = default
+        # code for values not in the mapping, -1 is NaN in a Categorical
+        self.default_code = self.categories.get_loc(default) if default is not None else -1
+
+        keys = list(mapping.keys())
+        key_codes = self.categories.get_indexer(list(mapping.values()))
+        self._lut = None
+        if keys and all(isinstance(k, (int, np.integer)) and not isinstance(k, bool) for k in keys):
+            lo, hi = min(keys), max(keys)
+            if hi - lo < _MAX_DENSE_RANGE:
+                self._offset = lo
+                self._lut = np.full(hi - lo + 1, self.default_code, dtype=np.int32)
+                self._lut[np.asarray(keys) - lo] = key_codes
+        if self._lut is None:
+            self._keys = pd.Index(keys)
+            self._key_codes = np.append(key_codes, self.default_code).astype(np.int32)
+
+    def codes(self, values):
+        values = np.asarray(values)
+        if self._lut is not None and values.dtype.kind in 'iuf':
+            if values.dtype.kind == 'f':
+                # NaN or non integral floats never match an int key
+                valid = np.isfinite(values) & (values == np.floor(np.nan_to_num(values)))
+            else:
+                valid = np.ones(len(values), dtype=bool)
+            shifted = np.where(valid, values, self._offset).astype(np.int64) - self._offset
+            valid &= (shifted >= 0) & (shifted < len(self._lut))
+            return np.where(valid, self._lut[np.clip(shifted, 0, len(self._lut) - 1)], self.default_code)
+        if self._lut is not None:
+            # non numeric column with int keys: fall back to the hash lookup
+            keys = self._offset + np.flatnonzero(self._lut != self.default_code)
+            self._keys = pd.Index(keys)
+            self._key_codes = np.append(self._lut[keys - self._offset], self.default_code)
+        positions = self._keys.get_indexer(values)     # -1 when not found
+        return self._key_codes[positions]
+
+    def __call__(self, series):
+        categorical = pd.Categorical.from_codes(self.codes(series), categories=self.categories)
+        return pd.Series(categorical, index=series.index, name=series.name)
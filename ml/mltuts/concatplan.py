@@ -0,0 +1,162 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# Planned concatenation of many frames
+#
+# pd.concat([df1, df2]) has to union the columns, find a common dtype for every
+# column and fill NaN where a frame doesn't have a column. Concatenating
+# thousands of shards in steps (or with differing columns) copies data more than
+# once. ConcatPlan first looks only at the schemas (column names, dtypes, row
+# counts) of all the shards, then:
+#   - computes the final columns, their dtypes and the total row count
+#   - allocates every output column once
+#   - copies each shard into its rows exactly once, NaN-filling only the slices
+#     of columns a shard doesn't have
+#
+# Shards are DataFrames or paths to parquet files. For parquet only the file
+# footer is read while planning, each file is loaded when it is copied.
+
+
+class _FrameShard:
+    def __init__(self, df):
+        self.df = df
+        self.columns = list(df.columns)
+        self.dtypes = dict(df.dtypes)
+        self.nrows = len(df)
+
+    def load(self):
+        return self.df
+
+
+class _ParquetShard:
+    def __init__(self, path):
+        import pyarrow.parquet as pq
+        meta = pq.read_metadata(path)
+        schema = meta.schema.to_arrow_schema()
+        index_cols = set()
+        if schema.pandas_metadata:
+            index_cols = {c for c in schema.pandas_metadata.get('index_columns', []) if isinstance(c, str)}
+        self.path = path
+        self.columns = [f.name for f in schema if f.name not in index_cols]
+        self.dtypes = {}
+        for field in schema:
+            try:
+                self.dtypes[field.name] = np.dtype(field.type.to_pandas_dtype())
+            except (NotImplementedError, TypeError):
+                self.dtypes[field.name] = np.dtype(object)
+        self.nrows = meta.num_rows
+
+    def load(self):
+        return pd.read_parquet(self.path)
+
+
+def _common_dtype(dtypes, has_missing):
+    dtypes = [np.dtype(d) if not isinstance(d, pd.api.extensions.ExtensionDtype) else d
+              for d in dtypes]
+    if any(isinstance(d, pd.api.extensions.ExtensionDtype) for d in dtypes):
+        if not has_missing and all(d == dtypes[0] for d in dtypes):
+            return dtypes[0]
+        return np.dtype(object)
+
+    kinds = {d.kind for d in dtypes}
+    if kinds <= set('iuf'):
+        dtype = np.result_type(*dtypes)
+        # ints can't hold NaN, same as pandas they become float
+        if has_missing and dtype.kind in 'iu':
+            return np.dtype(np.float64)
+        return dtype
+    if kinds == {'b'} and not has_missing:
+        return np.dtype(bool)
+    if kinds == {'M'} and len(set(dtypes)) == 1:
+        return dtypes[0]    # missing datetimes are NaT
+    return np.dtype(object)
+
+
+class ConcatPlan:
+    def __init__(self, shards):
+        self.shards = [s if isinstance(s, (_FrameShard, _ParquetShard))
+                       else _ParquetShard(s) if isinstance(s, str)
+                       else _FrameShard(s)
+                       for s in shards]
+
+        # union of the columns, in the order they first appear
+        self.columns = list(dict.fromkeys(c for s in self.shards for c in s.columns))
+        self.nrows = sum(s.nrows for s in self.shards)
+        self.dtypes = {}
+        for col in self.columns:
+            present = [s.dtypes[col] for s in self.shards if col in s.dtypes]
+            missing = len(present) < len(self.shards)
+            self.dtypes[col] = _common_dtype(present, missing)
+
+    def __repr__(self):
+        return "ConcatPlan(%d shards -> %d rows x %d columns)" % (
+            len(self.shards), self.nrows, len(self.columns))
+
+    def _allocate(self, col):
+        dtype = self.dtypes[col]
+        if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            return None     # extension arrays are concatenated by pandas
+        return np.empty(self.nrows, dtype=dtype)
+
+    def execute(self, ignore_index=False):
+        out = {col: self._allocate(col) for col in self.columns}
+        extension_parts = {col: [] for col in self.columns if out[col] is None}
+        indexes = []
+
+        start = 0
+        for shard in self.shards:
+            df = shard.load()
+            stop = start + len(df)
+            for col, values in out.items():
+                if values is None:
+                    extension_parts[col].append(df[col].array)
+                elif col in df.columns:
+                    values[start:stop] = df[col].to_numpy()
+                else:
+                    values[start:stop] = np.datetime64('NaT') if values.dtype.kind == 'M' else np.nan
+            if not ignore_index:
+                indexes.append(df.index)
+            start = stop
+
+        for col, parts in extension_parts.items():
+            out[col] = pd.concat([pd.Series(p) for p in parts], ignore_index=True).array
+
+        if ignore_index:
+            index = pd.RangeIndex(self.nrows)
+        else:
+            index = indexes[0].append(indexes[1:]) if indexes else pd.RangeIndex(0)
+        # copy=False: the allocated columns are used as they are, not copied again
+        return pd.DataFrame(out, index=index, columns=self.columns, copy=False)
+
+
+def planned_concat(shards, ignore_index=False):
+    # Same result as pd.concat(shards, ignore_index=ignore_index) for row-wise
+    # concatenation (axis=0, join='outer', sort=False)
+    return ConcatPlan(shards).execute(ignore_index=ignore_index)
+
+
+# Benchmark: n daily shards with slightly different columns
+#   python concatplan.py 2000 5000
+
+def _shard(day, rows, rng):
+    cols = {'value': rng.normal(size=rows), 'count': rng.integers(0, 100, rows)}
+    if day % 3:
+        cols['extra_%d' % (day % 5)] = rng.random(rows)
+    return pd.DataFrame(cols)
+
+
+if __name__ == '__main__':
+    n_shards = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rng = np.random.default_rng(0)
+    shards = [_shard(day, rows, rng) for day in range(n_shards)]
+
+    for name, func in [('pd.concat', lambda: pd.concat(shards, ignore_index=True)),
+                       ('planned_concat', lambda: planned_concat(shards, ignore_index=True))]:
+        start = time.perf_counter()
+        func()
+        print("%16s %8.3fs" % (name, time.perf_counter() - start))
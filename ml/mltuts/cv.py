@@ -0,0 +1,230 @@
+import hashlib
+import json
+import multiprocessing as mp
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+# K-fold cross validation without refitting the preprocessing per fold
+#
+# 8-train_test.py imputes (column means / most frequent category), one hot
+# encodes and splits once. With k folds the imputer and the encoder would be
+# refit k times on k - 1 blocks each, reading every row k - 1 times.
+#
+# Everything they learn comes from sufficient statistics which add up:
+#   numeric columns     count, sum, sum of squares  -> mean (imputation), std (scaling)
+#   category columns    value counts                -> mode (imputation), vocabulary (one hot)
+# So the rows are split in k blocks, the statistics of every block are computed
+# once, and the training statistics of fold i are total - block i.
+#
+# The transformed (X_train, X_test, y_train, y_test) of each fold are kept in
+# memory (and in cache_dir if given, keyed by the data and the settings), so
+# trying several models costs one preprocessing. Folds are fit in parallel
+# processes.
+#
+#   cv = CrossValidator(df, target='Purchased', numeric=['Age', 'Salary'],
+#                       categorical=['Country', 'Occupation'], k=5, cache_dir='/tmp/cv')
+#   cv.evaluate(lambda: LogisticRegression())          # [score of each fold]
+#   cv.evaluate(lambda: DecisionTreeClassifier())      # same fold matrices, not recomputed
+#   X_train, X_test, y_train, y_test = cv.fold(0)
+
+
+class BlockStats:
+    def __init__(self, count, total, squares, counts):
+        self.count = count          # {column: non null values}
+        self.total = total          # {column: sum}
+        self.squares = squares      # {column: sum of squares}
+        self.counts = counts        # {column: Counter of categories}
+
+    @classmethod
+    def of(cls, df, numeric, categorical):
+        count, total, squares = {}, {}, {}
+        for name in numeric:
+            values = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            count[name] = len(values)
+            total[name] = values.sum()
+            squares[name] = np.dot(values, values)
+        counts = {name: Counter(df[name].dropna().value_counts().to_dict()) for name in categorical}
+        return cls(count, total, squares, counts)
+
+    def __add__(self, other):
+        return BlockStats(
+            {k: v + other.count[k] for k, v in self.count.items()},
+            {k: v + other.total[k] for k, v in self.total.items()},
+            {k: v + other.squares[k] for k, v in self.squares.items()},
+            {k: v + other.counts[k] for k, v in self.counts.items()},
+        )
+
+    def __sub__(self, other):
+        # Counter subtraction drops the categories left with no rows
+        return BlockStats(
+            {k: v - other.count[k] for k, v in self.count.items()},
+            {k: v - other.total[k] for k, v in self.total.items()},
+            {k: v - other.squares[k] for k, v in self.squares.items()},
+            {k: v - other.counts[k] for k, v in self.counts.items()},
+        )
+
+
+class Preprocessor:
+    # What the imputer + ColumnTransformer(OneHotEncoder) would have learned,
+    # built from statistics instead of fit on rows
+    def __init__(self, stats, numeric, categorical, scale=False, dtype=np.float64):
+        self.numeric, self.categorical = list(numeric), list(categorical)
+        self.scale, self.dtype = scale, dtype
+        self.means, self.stds = {}, {}
+        for name in self.numeric:
+            n = max(stats.count[name], 1)
+            mean = stats.total[name] / n
+            self.means[name] = mean
+            self.stds[name] = np.sqrt(max(stats.squares[name] / n - mean * mean, 0.0)) or 1.0
+        # mode: most frequent, the smallest value on ties (as SimpleImputer does)
+        self.modes = {name: min(c.items(), key=lambda kv: (-kv[1], kv[0]))[0] if c else None
+                      for name, c in stats.counts.items()}
+        self.vocabulary = {name: sorted(c) for name, c in stats.counts.items()}
+
+    def feature_names(self):
+        names = ['%s_%s' % (name, v) for name in self.categorical for v in self.vocabulary[name]]
+        return names + self.numeric
+
+    def transform(self, df):
+        # one hot columns first then the numeric ones, like ColumnTransformer with
+        # remainder="passthrough"; categories not seen in training encode as all zeros
+        width = sum(len(v) for v in self.vocabulary.values()) + len(self.numeric)
+        X = np.zeros((len(df), width), dtype=self.dtype)
+        j = 0
+        for name in self.categorical:
+            vocabulary = self.vocabulary[name]
+            values = df[name] if self.modes[name] is None else df[name].fillna(self.modes[name])
+            codes = pd.Categorical(values, categories=vocabulary).codes
+            rows = np.flatnonzero(codes >= 0)
+            X[rows, j + codes[rows]] = 1
+            j += len(vocabulary)
+        for name in self.numeric:
+            values = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)
+            values = np.where(np.isnan(values), self.means[name], values)
+            if self.scale:
+                values = (values - self.means[name]) / self.stds[name]
+            X[:, j] = values
+            j += 1
+        return X
+
+
+# Worker side: the fold matrices and make_model are inherited from the parent
+# with fork (make_model can be a lambda then), only fold numbers go to the
+# workers and scores come back
+
+_worker = {}
+
+
+def _init_worker(folds, make_model, scoring):
+    _worker.update(folds=folds, make_model=make_model, scoring=scoring)
+
+
+def _fit_fold(i):
+    X_train, X_test, y_train, y_test = _worker['folds'][i]
+    model = _worker['make_model']()
+    model.fit(X_train, y_train)
+    if _worker['scoring'] is None:
+        return model.score(X_test, y_test)
+    return _worker['scoring'](y_test, model.predict(X_test))
+
+
+class CrossValidator:
+    def __init__(self, df, target, numeric, categorical, k=5, seed=0,
+                 scale=False, dtype=np.float64, cache_dir=None):
+        self.df, self.target = df, target
+        self.numeric, self.categorical = list(numeric), list(categorical)
+        self.k, self.seed, self.scale, self.dtype = k, seed, scale, dtype
+        self.cache_dir = cache_dir
+
+        order = np.random.default_rng(seed).permutation(len(df))
+        self.blocks = np.array_split(order, k)
+        self._block_stats = None
+        self._preprocessors = {}
+        self._folds = {}
+        self._key = None
+
+    def block_stats(self):
+        if self._block_stats is None:
+            self._block_stats = [BlockStats.of(self.df.iloc[rows], self.numeric, self.categorical)
+                                 for rows in self.blocks]
+            total = self._block_stats[0]
+            for stats in self._block_stats[1:]:
+                total = total + stats
+            self._total = total
+        return self._block_stats
+
+    def preprocessor(self, i):
+        # fitted on every block but i, from the statistics: no pass over the rows
+        if i not in self._preprocessors:
+            held_out = self.block_stats()[i]
+            stats = self._total - held_out if self.k > 1 else held_out
+            self._preprocessors[i] = Preprocessor(stats, self.numeric, self.categorical, self.scale, self.dtype)
+        return self._preprocessors[i]
+
+    def _cache_path(self, i):
+        if self.cache_dir is None:
+            return None
+        if self._key is None:
+            key = hashlib.sha1(pd.util.hash_pandas_object(self.df, index=False).to_numpy().tobytes())
+            key.update(json.dumps([self.target, self.numeric, self.categorical, self.k, self.seed,
+                                   self.scale, np.dtype(self.dtype).str]).encode())
+            self._key = key.hexdigest()[:16]
+        return os.path.join(self.cache_dir, '%s-fold%d.npz' % (self._key, i))
+
+    def fold(self, i):
+        if i in self._folds:
+            return self._folds[i]
+        path = self._cache_path(i)
+        if path and os.path.exists(path):
+            with np.load(path, allow_pickle=True) as f:
+                data = (f['X_train'], f['X_test'], f['y_train'], f['y_test'])
+        else:
+            test_rows = self.blocks[i]
+            train_rows = np.concatenate([b for j, b in enumerate(self.blocks) if j != i])
+            pre = self.preprocessor(i)
+            train, test = self.df.iloc[train_rows], self.df.iloc[test_rows]
+            data = (pre.transform(train), pre.transform(test),
+                    train[self.target].to_numpy(), test[self.target].to_numpy())
+            if path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                np.savez(path, X_train=data[0], X_test=data[1], y_train=data[2], y_test=data[3])
+        self._folds[i] = data
+        return data
+
+    def folds(self):
+        return [self.fold(i) for i in range(self.k)]
+
+    def evaluate(self, make_model, scoring=None, workers=None):
+        # make_model() returns a fresh unfitted model with fit/predict (and score
+        # if scoring is None); scoring(y_true, y_pred) -> float
+        folds = self.folds()
+        if workers == 1 or self.k == 1:
+            _init_worker(folds, make_model, scoring)
+            return [_fit_fold(i) for i in range(self.k)]
+        context = mp.get_context('fork') if 'fork' in mp.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=workers or min(self.k, mp.cpu_count()), mp_context=context,
+                                 initializer=_init_worker, initargs=(folds, make_model, scoring)) as pool:
+            return list(pool.map(_fit_fold, range(self.k)))
+
+
+if __name__ == '__main__':
+    import time
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.tree import DecisionTreeClassifier
+
+    df = pd.read_csv('data/missing.csv')
+    cv = CrossValidator(df, target='Purchased', numeric=['Age', 'Salary'],
+                        categorical=['Country', 'Gender', 'Occupation', 'Employment Status', 'Employement Type'],
+                        k=5, scale=True)
+    for name, make_model in [('logistic regression', LogisticRegression),
+                             ('decision tree', DecisionTreeClassifier)]:
+        start = time.perf_counter()
+        scores = cv.evaluate(make_model)
+        print("%-20s accuracy %.2f +- %.2f  (%.2fs)" % (name, np.mean(scores), np.std(scores),
+                                                       time.perf_counter() - start))
@@ -0,0 +1,189 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+# Hash based duplicate detection
+#
+# df.duplicated(cols) builds tuples of python objects per row. Instead every row
+# is reduced to a 64-bit fingerprint of its key columns (hash_pandas_object
+# hashes column by column, vectorized, and combines them), and duplicates are
+# found by sorting the fingerprints. Two different keys sharing a fingerprint is
+# ~n^2 / 2^65 likely, i.e. practically never for our data sizes.
+#
+# StreamDeduper does the same across a stream of chunks (e.g. daily event logs),
+# remembering the fingerprints of the last `capacity` distinct rows only.
+
+
+def _hash(values):
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def _column_hashes(col):
+    # hash_pandas_object hashes the bytes of the values: 1 as int64 and 1.0 as
+    # float64 get different hashes, and read_csv chunks are int or float depending
+    # on whether the chunk has a NaN. Numbers are hashed by value instead:
+    # integral values (ints, bools, floats like 3.0) as int64, exact for ids and
+    # ns timestamps above 2^53, other floats as float64, NaN and NA as one value.
+    dtype = col.dtype
+    if not pd.api.types.is_numeric_dtype(dtype) or dtype.kind in 'cu':
+        return _hash(col)
+    if dtype.kind in 'ib' or pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return _hash(pd.Series(col.to_numpy()).astype('Int64'))
+    values = col.to_numpy(dtype=np.float64, na_value=np.nan)
+    nan = np.isnan(values)
+    integral = ~nan & (np.floor(values) == values) & (np.abs(values) < 2.0 ** 63)
+    as_int = _hash(pd.Series(values).where(integral).astype('Int64'))   # NA where not integral
+    return np.where(integral | nan, as_int, _hash(pd.Series(values)))
+
+
+def fingerprints(df, keys=None):
+    subset = df if keys is None else df[list(keys)]
+    hashes = [_column_hashes(subset.iloc[:, i]) for i in range(subset.shape[1])]
+    if len(hashes) == 1:
+        return hashes[0]
+    # one 64-bit hash per column, combined row by row
+    return _hash(pd.DataFrame(dict(enumerate(hashes))))
+
+
+def duplicated_fingerprints(fp, keep='first'):
+    # Boolean mask, same semantics as DataFrame.duplicated(keep=...)
+    order = np.argsort(fp, kind='stable')
+    s = fp[order]
+    new_group = np.empty(len(s), dtype=bool)
+    new_group[:1] = True
+    np.not_equal(s[1:], s[:-1], out=new_group[1:])
+    last_of_group = np.empty(len(s), dtype=bool)
+    last_of_group[:-1] = new_group[1:]
+    last_of_group[-1:] = True
+
+    if keep == 'first':
+        dup_sorted = ~new_group
+    elif keep == 'last':
+        dup_sorted = ~last_of_group
+    elif keep is False:
+        dup_sorted = ~(new_group & last_of_group)   # groups of size > 1
+    else:
+        raise ValueError("keep must be 'first', 'last' or False")
+
+    mask = np.empty(len(fp), dtype=bool)
+    mask[order] = dup_sorted
+    return mask
+
+
+def duplicated(df, keys=None, keep='first'):
+    return pd.Series(duplicated_fingerprints(fingerprints(df, keys), keep), index=df.index)
+
+
+def drop_duplicates(df, keys=None, keep='first'):
+    return df[~duplicated_fingerprints(fingerprints(df, keys), keep)]
+
+
+class BloomFilter:
+    # Bit array with k probes per fingerprint (double hashing of the two 32-bit
+    # halves). "Not in the filter" is certain, "in the filter" may be wrong.
+    def __init__(self, n_bits=1 << 27, n_hashes=4):
+        self.n_bits = n_bits
+        self.n_hashes = n_hashes
+        self.bits = np.zeros((n_bits + 7) // 8, dtype=np.uint8)
+
+    def _probes(self, fp):
+        h1 = fp & np.uint64(0xFFFFFFFF)
+        h2 = (fp >> np.uint64(32)) | np.uint64(1)
+        i = np.arange(self.n_hashes, dtype=np.uint64)[:, None]
+        return (h1 + i * h2) % np.uint64(self.n_bits)
+
+    def add(self, fp):
+        probes = self._probes(fp).ravel()
+        masks = np.left_shift(np.uint8(1), (probes & np.uint64(7)).astype(np.uint8))
+        np.bitwise_or.at(self.bits, probes >> np.uint64(3), masks)
+
+    def might_contain(self, fp):
+        probes = self._probes(fp)
+        hit = (self.bits[probes >> np.uint64(3)] >> (probes & np.uint64(7)).astype(np.uint8)) & 1
+        return hit.all(axis=0).astype(bool)
+
+
+class StreamDeduper:
+    # Keeps the first occurrence of every key across all the chunks seen so far.
+    # Fingerprints are kept as one sorted array per chunk; once more than
+    # `capacity` are held the oldest chunks are forgotten, so a key repeating
+    # after that window passes again.
+    def __init__(self, keys=None, capacity=50_000_000, bloom_bits=None, bloom_hashes=4):
+        self.keys = keys
+        self.capacity = capacity
+        self.bloom = BloomFilter(bloom_bits, bloom_hashes) if bloom_bits else None
+        self._generations = deque()
+        self._held = 0
+        self.rows_in = 0
+        self.rows_out = 0
+
+    def _seen(self, fp):
+        seen = np.zeros(len(fp), dtype=bool)
+        candidates = np.arange(len(fp))
+        if self.bloom is not None:
+            # only what the bloom filter may have seen needs the exact lookup
+            candidates = candidates[self.bloom.might_contain(fp)]
+        for generation in self._generations:
+            if not len(candidates):
+                break
+            probe = fp[candidates]
+            pos = np.searchsorted(generation, probe)
+            pos[pos == len(generation)] = 0
+            found = generation[pos] == probe
+            seen[candidates[found]] = True
+            candidates = candidates[~found]
+        return seen
+
+    def _remember(self, fp):
+        if self.bloom is not None:
+            self.bloom.add(fp)
+        if not len(fp):
+            return
+        generation = np.sort(fp)
+        self._generations.append(generation)
+        self._held += len(generation)
+        while self._held > self.capacity and len(self._generations) > 1:
+            self._held -= len(self._generations.popleft())
+
+    def process(self, chunk):
+        # Returns the rows of chunk which weren't seen before (in this chunk or earlier ones)
+        fp = fingerprints(chunk, self.keys)
+        keep = ~duplicated_fingerprints(fp, keep='first')
+        keep[keep] = ~self._seen(fp[keep])
+        self._remember(fp[keep])
+        self.rows_in += len(chunk)
+        self.rows_out += int(keep.sum())
+        return chunk[keep]
+
+    def stream(self, chunks):
+        for chunk in chunks:
+            yield self.process(chunk)
+
+
+def dedup_csv(path, keys=None, chunksize=1_000_000, **kwargs):
+    # e.g. pd.concat(dedup_csv('events.csv', ['user', 'event', 'ts']))
+    deduper = StreamDeduper(keys, **kwargs)
+    return deduper.stream(pd.read_csv(path, chunksize=chunksize))
+
+
+# Checks against pandas' duplicated(), including keys pandas hashes by dtype
+#   python dedup.py
+
+if __name__ == '__main__':
+    df = pd.read_csv("data/titanic.csv")
+    for keys in (None, ['Age', 'Sex', 'Pclass', 'Fare'], ['Ticket']):
+        for keep in ('first', 'last', False):
+            assert duplicated(df, keys, keep).equals(df.duplicated(keys, keep=keep)), (keys, keep)
+
+    # ns timestamps and ids above 2^53: distinct as int64, equal if cast to float64
+    ts = pd.DataFrame({'ts': [1_700_000_000_000_000_000, 1_700_000_000_000_000_001, 1_700_000_000_000_000_100]})
+    assert not duplicated(ts).any()
+
+    # the same values in an int chunk and in a float chunk (a NaN elsewhere in it)
+    deduper = StreamDeduper(keys=['id', 'ts'])
+    first = deduper.process(pd.DataFrame({'id': [1, 2], 'ts': [10, 20]}))
+    second = deduper.process(pd.DataFrame({'id': [1.0, np.nan, 2.5], 'ts': [10.0, 30.0, 40.0]}))
+    assert len(first) == 2 and second['id'].isnull().sum() == 1 and len(second) == 2
+    print("dedup checks passed")
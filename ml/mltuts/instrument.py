@@ -0,0 +1,205 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:     # windows
+    resource = None
+
+
+# Stage level timing and memory instrumentation
+#
+#   from instrument import stage
+#
+#   with stage('impute') as s:
+#       s.rows_in = len(df)
+#       df = ...
+#       s.rows_out = len(df)
+#
+#   @stage('encode')            # as a decorator, rows in/out are taken from
+#   def encode(df): ...         # len() of the first argument and of the result
+#
+# Each stage records wall time, CPU time, the growth of the process peak RSS
+# and rows in/out. Stages nest, the records can be exported as a chrome trace
+# (chrome://tracing, perfetto, speedscope) or as collapsed stacks for
+# flamegraph.pl.
+#
+# Instrumentation is off unless ML_TRACE=1 is set (or enable() is called), when
+# off `with stage(...)` only costs a flag check.
+
+_enabled = os.environ.get('ML_TRACE', '') not in ('', '0')
+_records = []
+_local = threading.local()
+_origin = time.perf_counter()
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def enabled():
+    return _enabled
+
+
+def reset():
+    del _records[:]
+
+
+def records():
+    return list(_records)
+
+
+def _peak_rss():
+    # bytes; ru_maxrss is KiB on linux and bytes on macOS
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+class _NoStage:
+    rows_in = rows_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+class _Stage:
+    def __init__(self, name):
+        self.name = name
+        self.rows_in = None
+        self.rows_out = None
+
+    def __enter__(self):
+        stack = _stack()
+        self.path = tuple(s.name for s in stack) + (self.name,)
+        stack.append(self)
+        self._rss = _peak_rss()
+        self._cpu = time.process_time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        cpu = time.process_time() - self._cpu
+        _stack().pop()
+        _records.append({
+            'name': self.name,
+            'path': self.path,
+            'start_s': self._start - _origin,
+            'wall_s': end - self._start,
+            'cpu_s': cpu,
+            'peak_rss_delta_bytes': _peak_rss() - self._rss,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'thread': threading.get_ident(),
+        })
+        return False
+
+
+def _rows(obj):
+    try:
+        return len(obj)
+    except TypeError:
+        return None
+
+
+class stage:
+    # Context manager and decorator
+    def __init__(self, name):
+        self.name = name
+        self._current = None
+
+    def __enter__(self):
+        if not _enabled:
+            return _NO_STAGE
+        self._current = _Stage(self.name)
+        return self._current.__enter__()
+
+    def __exit__(self, *exc):
+        if self._current is None:
+            return False
+        current, self._current = self._current, None
+        return current.__exit__(*exc)
+
+    def __call__(self, func):
+        name = self.name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(name) as s:
+                s.rows_in = _rows(args[0]) if args else None
+                result = func(*args, **kwargs)
+                s.rows_out = _rows(result)
+            return result
+        return wrapper
+
+
+# Reporting and export
+
+def summary(out=sys.stdout):
+    out.write("%-32s %10s %10s %12s %10s %10s\n" % (
+        'stage', 'wall [s]', 'cpu [s]', 'peak RSS +MB', 'rows in', 'rows out'))
+    for r in sorted(_records, key=lambda r: r['start_s']):
+        out.write("%-32s %10.3f %10.3f %12.1f %10s %10s\n" % (
+            '  ' * (len(r['path']) - 1) + r['name'], r['wall_s'], r['cpu_s'],
+            r['peak_rss_delta_bytes'] / 2 ** 20,
+            '' if r['rows_in'] is None else r['rows_in'],
+            '' if r['rows_out'] is None else r['rows_out'],
+        ))
+
+
+def export_json(path):
+    with open(path, 'w') as f:
+        json.dump([dict(r, path=list(r['path'])) for r in _records], f, indent=1)
+
+
+def export_chrome_trace(path):
+    # Complete ("X") events in microseconds
+    pid = os.getpid()
+    events = [{
+        'name': r['name'], 'ph': 'X', 'pid': pid, 'tid': r['thread'],
+        'ts': r['start_s'] * 1e6, 'dur': r['wall_s'] * 1e6,
+        'args': {k: r[k] for k in ('cpu_s', 'peak_rss_delta_bytes', 'rows_in', 'rows_out')},
+    } for r in _records]
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+def export_collapsed(path):
+    # "outer;inner <self time in us>" per line, the input format of flamegraph.pl.
+    # A path can run many times: its wall times and its children's wall times
+    # are both summed over all the runs before taking the difference
+    wall, child_time = {}, {}
+    for r in _records:
+        wall[r['path']] = wall.get(r['path'], 0.0) + r['wall_s']
+        parent = r['path'][:-1]
+        if parent:
+            child_time[parent] = child_time.get(parent, 0.0) + r['wall_s']
+    with open(path, 'w') as f:
+        for stack, seconds in wall.items():
+            own = seconds - child_time.get(stack, 0.0)
+            f.write('%s %d\n' % (';'.join(stack), max(round(own * 1e6), 0)))
@@ -0,0 +1,263 @@
+import operator
+
+import pandas as pd
+
+
+# Lazy queries on a dataframe or a csv file
+#
+# df[mask][cols].sort_values(by).head(n) makes a full copy at every step.
+# LazyFrame only records the operations; collect() optimizes them first:
+#   - all filters are combined into one predicate, evaluated while loading
+#     (chunk by chunk for csv files, so filtered out rows are never kept)
+#   - only the columns the query uses are loaded (read_csv usecols)
+#   - sort followed by head becomes a top-k (nsmallest/nlargest) kept per chunk
+#     instead of sorting everything
+# and runs everything in one pass over the data. explain() prints the plan.
+#
+#   from lazyframe import LazyFrame, col
+#   (LazyFrame.scan_csv("data/titanic.csv")
+#       .filter(col('Age') < 20)
+#       .select(['Name', 'Age', 'Sex', 'Pclass', 'Fare'])
+#       .sort('Age')
+#       .head(10)
+#       .collect())
+
+
+class Predicate:
+    def __init__(self, func, columns, text):
+        self.func = func
+        self.columns = set(columns)
+        self.text = text
+
+    def __call__(self, df):
+        return self.func(df)
+
+    def __and__(self, other):
+        return Predicate(lambda df: self(df) & other(df), self.columns | other.columns,
+                         '(%s & %s)' % (self.text, other.text))
+
+    def __or__(self, other):
+        return Predicate(lambda df: self(df) | other(df), self.columns | other.columns,
+                         '(%s | %s)' % (self.text, other.text))
+
+    def __invert__(self):
+        return Predicate(lambda df: ~self(df), self.columns, '~%s' % self.text)
+
+    def __repr__(self):
+        return self.text
+
+
+class Col:
+    def __init__(self, name):
+        self.name = name
+
+    def _compare(self, op, symbol, value):
+        name = self.name
+        return Predicate(lambda df: op(df[name], value), [name], '(%s %s %r)' % (name, symbol, value))
+
+    def __eq__(self, value):
+        return self._compare(operator.eq, '==', value)
+
+    def __ne__(self, value):
+        return self._compare(operator.ne, '!=', value)
+
+    def __lt__(self, value):
+        return self._compare(operator.lt, '<', value)
+
+    def __le__(self, value):
+        return self._compare(operator.le, '<=', value)
+
+    def __gt__(self, value):
+        return self._compare(operator.gt, '>', value)
+
+    def __ge__(self, value):
+        return self._compare(operator.ge, '>=', value)
+
+    def isin(self, values):
+        name, values = self.name, list(values)
+        return Predicate(lambda df: df[name].isin(values), [name], '(%s in %r)' % (name, values))
+
+    def isnull(self):
+        name = self.name
+        return Predicate(lambda df: df[name].isnull(), [name], '(%s is null)' % name)
+
+    def notnull(self):
+        return ~self.isnull()
+
+
+def col(name):
+    return Col(name)
+
+
+class LazyFrame:
+    def __init__(self, source, ops=()):
+        # source: ('frame', df) or ('csv', path, read_csv kwargs)
+        self._source = source
+        self._ops = tuple(ops)
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(('frame', df))
+
+    @classmethod
+    def scan_csv(cls, path, chunksize=100_000, **kwargs):
+        return cls(('csv', path, dict(kwargs, chunksize=chunksize)))
+
+    def _then(self, *op):
+        return LazyFrame(self._source, self._ops + (op,))
+
+    def filter(self, predicate):
+        return self._then('filter', predicate)
+
+    def drop_where(self, predicate):
+        # df.drop(df[predicate].index) without building the mask's index
+        return self._then('filter', ~predicate)
+
+    def select(self, columns):
+        return self._then('select', list(columns))
+
+    def drop(self, columns):
+        return self._then('drop', list(columns))
+
+    def sort(self, by, ascending=True):
+        by = [by] if isinstance(by, str) else list(by)
+        return self._then('sort', by, ascending)
+
+    def head(self, n=5):
+        return self._then('head', n)
+
+    # Planning
+
+    def _source_columns(self):
+        if self._source[0] == 'frame':
+            return list(self._source[1].columns)
+        kwargs = {k: v for k, v in self._source[2].items() if k != 'chunksize'}
+        return list(pd.read_csv(self._source[1], nrows=0, **kwargs).columns)
+
+    def _optimize(self):
+        # Everything up to (and including) the first head is fused into the scan,
+        # operations after it run on the (small) result
+        ops = list(self._ops)
+        cut = next((i + 1 for i, op in enumerate(ops) if op[0] == 'head'), len(ops))
+        fused, rest = ops[:cut], ops[cut:]
+
+        columns = self._source_columns()
+        predicate, sort, limit = None, None, None
+        for op in fused:
+            if op[0] == 'filter':
+                predicate = op[1] if predicate is None else predicate & op[1]
+            elif op[0] == 'select':
+                columns = list(op[1])
+            elif op[0] == 'drop':
+                columns = [c for c in columns if c not in op[1]]
+            elif op[0] == 'sort':
+                sort = (op[1], op[2])
+            elif op[0] == 'head':
+                limit = op[1]
+
+        needed = list(columns)
+        if predicate is not None:
+            needed += sorted(c for c in predicate.columns if c not in needed)
+        if sort:
+            needed += [c for c in sort[0] if c not in needed]
+        return {
+            'columns': columns, 'needed': needed, 'predicate': predicate,
+            'sort': sort, 'limit': limit, 'rest': rest,
+        }
+
+    def explain(self):
+        plan = self._optimize()
+        lines = ['Logical plan:']
+        lines += ['  %s %s' % (op[0], ', '.join(repr(a) for a in op[1:])) for op in self._ops]
+        lines.append('Optimized plan:')
+        if self._source[0] == 'csv':
+            lines.append('  Scan csv %r usecols=%r chunksize=%s' % (
+                self._source[1], plan['needed'], self._source[2]['chunksize']))
+        else:
+            lines.append('  Scan frame columns=%r' % plan['needed'])
+        if plan['predicate'] is not None:
+            lines.append('    Filter %r  (pushed into scan)' % plan['predicate'])
+        if plan['sort'] and plan['limit'] is not None:
+            lines.append('  TopK %d by %r ascending=%r  (per chunk)' % ((plan['limit'],) + plan['sort']))
+        elif plan['sort']:
+            lines.append('  Sort by %r ascending=%r' % plan['sort'])
+        elif plan['limit'] is not None:
+            lines.append('  Limit %d  (scan stops early)' % plan['limit'])
+        lines.append('  Project %r' % plan['columns'])
+        for op in plan['rest']:
+            lines.append('  %s %s  (on result)' % (op[0], ', '.join(repr(a) for a in op[1:])))
+        text = '\n'.join(lines)
+        print(text)
+        return text
+
+    # Execution
+
+    def _chunks(self, needed):
+        if self._source[0] == 'frame':
+            yield self._source[1]
+        else:
+            yield from pd.read_csv(self._source[1], usecols=needed, **self._source[2])
+
+    @staticmethod
+    def _top_k(df, by, ascending, k):
+        numeric = all(pd.api.types.is_numeric_dtype(df[c]) for c in by)
+        if numeric and ascending in (True, False):
+            pick = df.nsmallest if ascending else df.nlargest
+            return pick(k, by, keep='first')
+        return df.sort_values(by, ascending=ascending, kind='stable').head(k)
+
+    def collect(self):
+        plan = self._optimize()
+        predicate, sort, limit = plan['predicate'], plan['sort'], plan['limit']
+
+        needed = plan['needed']
+        parts, kept = [], 0
+        for chunk in self._chunks(needed):
+            # filter and projection in a single copy
+            if predicate is not None:
+                chunk = chunk.loc[predicate(chunk).to_numpy(), needed]
+            else:
+                chunk = chunk[needed]
+            if sort and limit is not None:
+                # only the running top k is ever kept
+                chunk = self._top_k(pd.concat(parts + [chunk]), sort[0], sort[1], limit)
+                parts = [chunk]
+                continue
+            parts.append(chunk)
+            kept += len(chunk)
+            if limit is not None and not sort and kept >= limit:
+                break
+
+        df = pd.concat(parts) if parts else pd.DataFrame(columns=needed)
+        if sort and limit is None:
+            df = df.sort_values(sort[0], ascending=sort[1], kind='stable')
+        if limit is not None:
+            df = df.head(limit)
+        df = df[plan['columns']]
+
+        for op in plan['rest']:
+            df = LazyFrame.from_frame(df)._then(*op).collect()
+        return df
+
+
+# Check: the 2-accessing-index-drop-groupby.py query against the eager pandas
+# version (stable sort, nsmallest keeps ties in file order too)
+#   python lazyframe.py
+
+if __name__ == '__main__':
+    cols = ['Name', 'Age', 'Pclass', 'Fare']
+    for chunksize in (100_000, 100):
+        query = (
+            LazyFrame.scan_csv("data/titanic.csv", chunksize=chunksize)
+            .drop_where(col('Sex') == 'male')
+            .select(cols)
+            .sort('Age')
+            .head(10)
+        )
+        got = query.collect()
+        df = pd.read_csv("data/titanic.csv")
+        male = df['Sex'] == 'male'
+        expected = df[~male][cols].sort_values('Age', kind='stable').head(10)
+        pd.testing.assert_frame_equal(got, expected)
+    query.explain()
+    print(got)
@@ -0,0 +1,142 @@
+import multiprocessing as mp
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+# Parallel row apply for functions which can't be vectorized
+#
+# df.apply(func, axis=1) runs on one core, builds a Series per row, and
+# multiprocessing the naive way pickles the whole frame to every worker.
+# parallel_apply:
+#   - copies only the columns func needs into shared memory blocks, once
+#     (numbers as they are, strings as one utf-8 buffer + offsets)
+#   - splits the rows in chunks, workers attach to the blocks and rebuild just
+#     their slice of rows, then run func on itertuples (row.Name, row.Age, ...)
+#   - puts the results back together in the original order
+# Small frames (< min_rows) run serially, it's not worth starting processes.
+#
+#   import re
+#   title = re.compile(r',\s*([^.]+)\.')
+#   def parse_title(row):
+#       match = title.search(row.Name)
+#       return match.group(1) if match else None
+#   df['Title'] = parallel_apply(df, parse_title, columns=['Name'])
+#
+# With the fork start method (linux) func can be a lambda or a function defined
+# in the script; with spawn (macOS, windows) it has to be importable.
+
+
+def _to_shared(values, blocks):
+    block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    blocks.append(block)
+    np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+    return {'name': block.name, 'dtype': values.dtype.str, 'shape': values.shape}
+
+
+def _share_column(series, blocks):
+    values = series.to_numpy()
+    if values.dtype != object:
+        return {'kind': 'array', 'data': _to_shared(values, blocks)}
+
+    null = series.isnull().to_numpy()
+    if not all(isinstance(v, str) for v in values[~null]):
+        # not plain strings: this column is handed to the workers when they start
+        return {'kind': 'pickled', 'values': values}
+    encoded = [b'' if n else v.encode('utf-8') for v, n in zip(values, null)]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+    return {
+        'kind': 'strings',
+        'data': _to_shared(np.frombuffer(b''.join(encoded), dtype=np.uint8), blocks),
+        'offsets': _to_shared(offsets, blocks),
+        'null': _to_shared(null, blocks),
+    }
+
+
+# Worker side
+
+_worker = {}
+
+
+def _attach(meta):
+    try:
+        # the parent owns (and unlinks) the blocks, workers shouldn't track them
+        block = shared_memory.SharedMemory(name=meta['name'], track=False)
+    except TypeError:   # python < 3.13
+        block = shared_memory.SharedMemory(name=meta['name'])
+    _worker.setdefault('blocks', []).append(block)   # keep the mapping alive
+    return np.ndarray(meta['shape'], dtype=np.dtype(meta['dtype']), buffer=block.buf)
+
+
+def _init_worker(func, spec):
+    _worker['func'] = func
+    columns = {}
+    for name, col in spec.items():
+        if col['kind'] == 'array':
+            columns[name] = ('array', _attach(col['data']))
+        elif col['kind'] == 'strings':
+            columns[name] = ('strings', _attach(col['data']), _attach(col['offsets']), _attach(col['null']))
+        else:
+            columns[name] = ('pickled', col['values'])
+    _worker['columns'] = columns
+
+
+def _slice(col, start, stop):
+    if col[0] == 'strings':
+        _, data, offsets, null = col
+        buf = data.data     # memoryview on the shared block, slicing it doesn't copy
+        out = np.empty(stop - start, dtype=object)
+        for i in range(start, stop):
+            out[i - start] = np.nan if null[i] else str(buf[offsets[i]:offsets[i + 1]], 'utf-8')
+        return out
+    return col[1][start:stop]
+
+
+def _run_chunk(start, stop):
+    frame = pd.DataFrame({name: _slice(col, start, stop) for name, col in _worker['columns'].items()})
+    func = _worker['func']
+    return start, [func(row) for row in frame.itertuples(index=False, name='Row')]
+
+
+def parallel_apply(df, func, columns=None, workers=None, chunksize=None,
+                   min_rows=10_000, progress=True):
+    columns = list(df.columns) if columns is None else list(columns)
+    n = len(df)
+    workers = workers or mp.cpu_count()
+    if n < min_rows or workers == 1:
+        result = [func(row) for row in df[columns].itertuples(index=False, name='Row')]
+        return pd.Series(result, index=df.index)
+
+    chunksize = chunksize or max(1000, -(-n // (workers * 8)))
+    blocks = []
+    try:
+        spec = {name: _share_column(df[name], blocks) for name in columns}
+        for name, col in spec.items():
+            if col['kind'] == 'pickled' and progress:
+                sys.stderr.write("parallel_apply: column %r is not strings/numbers, not shared\n" % name)
+
+        context = mp.get_context('fork') if 'fork' in mp.get_all_start_methods() else None
+        results = [None] * n
+        done, start_time = 0, time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(func, spec)) as pool:
+            futures = [pool.submit(_run_chunk, lo, min(lo + chunksize, n)) for lo in range(0, n, chunksize)]
+            for future in as_completed(futures):
+                lo, values = future.result()
+                results[lo:lo + len(values)] = values
+                done += len(values)
+                if progress:
+                    elapsed = time.perf_counter() - start_time
+                    sys.stderr.write("\rparallel_apply: %d/%d rows, %.0f rows/sec" % (done, n, done / elapsed))
+        if progress:
+            sys.stderr.write("\n")
+        return pd.Series(results, index=df.index)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
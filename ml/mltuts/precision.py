@@ -0,0 +1,214 @@
+import sys
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+
+# Reduced precision for features
+#
+# numpy and pandas default to float64 / int64. Most features don't need 15
+# significant digits: float32 halves the memory and the memory bandwidth (and
+# keras computes in float32 anyway). Sums over millions of float32 values do
+# lose accuracy though, so reductions (mean, var, sums) accumulate in float64
+# and only their results are stored back as float32.
+#
+#   import precision
+#   df = precision.read_csv("data/Salary.csv")     # float columns as float32, ints downcast
+#   x = precision.standard_scale(df[['Age', 'Salary']].to_numpy())
+#   precision.mean(x, axis=0)                        # accumulated in float64
+#
+#   with precision.policy(features='float64'):      # full precision for a block
+#       ...
+#
+#   python precision.py 10000000                     # accuracy vs speed, float64 vs float32
+
+_policy = {'features': np.dtype(np.float32), 'accumulator': np.dtype(np.float64)}
+
+
+def set_policy(features=None, accumulator=None):
+    if features is not None:
+        _policy['features'] = np.dtype(features)
+    if accumulator is not None:
+        _policy['accumulator'] = np.dtype(accumulator)
+
+
+@contextmanager
+def policy(features=None, accumulator=None):
+    saved = dict(_policy)
+    set_policy(features, accumulator)
+    try:
+        yield
+    finally:
+        _policy.update(saved)
+
+
+def feature_dtype():
+    return _policy['features']
+
+
+def accumulator_dtype():
+    return _policy['accumulator']
+
+
+# Loaders
+
+def as_features(data, downcast_ints=True):
+    # Floats to the feature dtype, ints to the smallest int type holding them
+    if isinstance(data, pd.DataFrame):
+        out = {}
+        for name in data.columns:
+            col = data[name]
+            if pd.api.types.is_float_dtype(col):
+                col = col.astype(feature_dtype(), copy=False)
+            elif downcast_ints and pd.api.types.is_integer_dtype(col):
+                col = pd.to_numeric(col, downcast='integer')
+            out[name] = col
+        return pd.DataFrame(out, index=data.index)
+    if isinstance(data, pd.Series):
+        return as_features(data.to_frame(name=0), downcast_ints).iloc[:, 0].rename(data.name)
+    data = np.asarray(data)
+    if data.dtype.kind == 'f':
+        return data.astype(feature_dtype(), copy=False)
+    if downcast_ints and data.dtype.kind in 'iu':
+        return data.astype(_smallest_int(data), copy=False)
+    return data
+
+
+def _smallest_int(data):
+    # the int type pd.to_numeric(downcast='integer') would pick, for any shape
+    if data.size == 0:
+        return data.dtype
+    lo, hi = data.min(), data.max()
+    for dtype in (np.int8, np.int16, np.int32, np.int64):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dtype)
+    return data.dtype
+
+
+def _floats(x):
+    # Scalers compute in the feature dtype, so ints are cast to it here: with
+    # float32 ints above 2**24 (16777217 -> 16777216.0) get rounded
+    x = as_features(x)
+    return x if x.dtype.kind == 'f' else x.astype(feature_dtype())
+
+
+def read_csv(path, sample_rows=1000, **kwargs):
+    # Float columns are parsed straight into the feature dtype (no float64 copy
+    # first), the types are guessed on the first sample_rows rows
+    sample = pd.read_csv(path, **dict(kwargs, nrows=sample_rows))
+    dtypes = {name: feature_dtype() for name in sample.columns
+              if pd.api.types.is_float_dtype(sample[name])}
+    dtypes.update(kwargs.pop('dtype', None) or {})
+    return as_features(pd.read_csv(path, dtype=dtypes, **kwargs))
+
+
+# Reductions: float64 accumulators, results in the feature dtype
+
+def _result(value):
+    return np.asarray(value).astype(feature_dtype()) if np.ndim(value) else value
+
+
+def mean(x, axis=None):
+    return _result(np.mean(x, axis=axis, dtype=accumulator_dtype()))
+
+
+def var(x, axis=None, ddof=0):
+    return _result(np.var(x, axis=axis, ddof=ddof, dtype=accumulator_dtype()))
+
+
+def std(x, axis=None, ddof=0):
+    return _result(np.std(x, axis=axis, ddof=ddof, dtype=accumulator_dtype()))
+
+
+def total(x, axis=None):
+    return _result(np.sum(x, axis=axis, dtype=accumulator_dtype()))
+
+
+def percentile(x, q, axis=None):
+    # order statistics don't accumulate, the feature dtype is enough
+    return np.percentile(as_features(x), q, axis=axis)
+
+
+# Scalers (same results as sklearn's MinMaxScaler, StandardScaler, Normalizer)
+
+def minmax_scale(x, feature_range=(0, 1)):
+    x = _floats(x)
+    lo, hi = x.min(axis=0), x.max(axis=0)
+    span = (hi - lo).astype(np.float64)
+    span[span == 0] = 1.0
+    scale = ((feature_range[1] - feature_range[0]) / span).astype(x.dtype)
+    out = x - lo
+    out *= scale
+    out += np.asarray(feature_range[0], dtype=x.dtype)
+    return out
+
+
+def standard_scale(x):
+    x = _floats(x)
+    m = np.mean(x, axis=0, dtype=accumulator_dtype())
+    s = np.std(x, axis=0, dtype=accumulator_dtype())
+    s[s == 0] = 1.0
+    out = x - m.astype(x.dtype)
+    out /= s.astype(x.dtype)
+    return out
+
+
+def normalize(x, norm='l2'):
+    x = _floats(x)
+    if norm == 'l1':
+        norms = np.abs(x).sum(axis=1, dtype=accumulator_dtype())
+    elif norm == 'max':
+        norms = np.abs(x).max(axis=1).astype(accumulator_dtype())
+    else:
+        norms = np.sqrt(np.einsum('ij,ij->i', x, x, dtype=accumulator_dtype()))
+    norms[norms == 0] = 1.0
+    return x / norms.astype(x.dtype)[:, None]
+
+
+# Accuracy vs speed: every operation in float64 (reference) and with the policy
+
+def _bench(x, func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(x)
+        best = min(best, time.perf_counter() - start)
+    return best, np.asarray(result, dtype=np.float64)
+
+
+if __name__ == '__main__':
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10 ** 7
+    rng = np.random.default_rng(0)
+    x64 = rng.normal(loc=50_000, scale=20_000, size=(n, 4))
+    x32 = x64.astype(np.float32)
+
+    checks = [
+        ('mean', lambda x: mean(x, axis=0), 1e-6),
+        ('std', lambda x: std(x, axis=0), 1e-5),
+        ('sum', lambda x: total(x, axis=0), 1e-6),
+        ('percentile', lambda x: percentile(x, [25, 50, 75], axis=0), 1e-6),
+        ('minmax_scale', minmax_scale, 1e-5),
+        ('standard_scale', standard_scale, 1e-5),
+        ('normalize', normalize, 1e-5),
+    ]
+    # ints are downcast, never rounded through the float feature dtype
+    big = np.array([[16777217, -3], [2 ** 40, 7]])
+    assert as_features(big).dtype == np.int64 and np.array_equal(as_features(big), big)
+    assert as_features(np.array([[1, 200], [3, 4]])).dtype == np.int16
+    assert as_features(big, downcast_ints=False) is big
+
+    failed = False
+    print("%16s %12s %12s %8s %14s" % ('operation', 'float64 [s]', 'float32 [s]', 'speedup', 'max rel error'))
+    for name, func, rtol in checks:
+        with policy(features='float64'):
+            t64, ref = _bench(x64, func)
+        t32, got = _bench(x32, func)
+        scale = np.maximum(np.abs(ref).max(), 1e-12)
+        error = np.abs(got - ref).max() / scale
+        ok = error <= rtol
+        failed |= not ok
+        print("%16s %12.3f %12.3f %7.1fx %14.2e %s" % (name, t64, t32, t64 / t32, error, '' if ok else 'FAIL'))
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,154 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+# Data quality profile of a file in one pass
+#
+# df.isnull().sum(), [col for col in df if df[col].isnull().any()], unique() and
+# value_counts() per column each go over the whole frame again. profile() reads
+# the file once, chunk by chunk, and for every column keeps:
+#   - row and null counts
+#   - min / max
+#   - an estimate of the number of distinct values (HyperLogLog: 16k one-byte
+#     registers per column, ~1% error, whatever the cardinality)
+#   - the most frequent values (counts merged chunk by chunk, bounded)
+# The columns of a chunk are processed in parallel threads.
+#
+#   python profiler.py data/missing.csv
+
+
+class HyperLogLog:
+    def __init__(self, p=14):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add_hashes(self, h):
+        h = np.asarray(h, dtype=np.uint64)
+        idx = (h >> np.uint64(64 - self.p)).astype(np.intp)
+        rest = h & np.uint64((1 << (64 - self.p)) - 1)
+        # rest has 64 - p (= 50) bits, exact as a float64: frexp gives its bit length
+        _, bits = np.frexp(rest.astype(np.float64))
+        rho = (64 - self.p - bits + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rho)
+
+    def estimate(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)    # small range correction
+        return int(round(estimate))
+
+
+def _common_dtype(a, b):
+    # int64 then float64 (a chunk with NaN) -> float64, anything else mixed -> object
+    if a is None or a == b:
+        return b
+    try:
+        return np.result_type(a, b)
+    except TypeError:
+        return np.dtype(object)
+
+
+def _hashes(values):
+    # Numbers are hashed by value, not by dtype (hash_pandas_object hashes the
+    # bytes): 1 in an int chunk and 1.0 in a float chunk count as one value.
+    # Integral values as int64 (exact above 2^53), other floats as float64
+    hash_ = lambda v: pd.util.hash_pandas_object(v, index=False).to_numpy()
+    dtype = values.dtype
+    if not pd.api.types.is_numeric_dtype(dtype) or dtype.kind in 'cu':
+        return hash_(values)
+    if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return hash_(pd.Series(values.to_numpy()).astype('Int64'))
+    floats = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    integral = (np.floor(floats) == floats) & (np.abs(floats) < 2.0 ** 63)
+    as_int = hash_(pd.Series(floats).where(integral).astype('Int64'))
+    return np.where(integral, as_int, hash_(pd.Series(floats)))
+
+
+class _ColumnProfile:
+    def __init__(self, name, top, capacity):
+        self.name = name
+        self.top = top
+        self.capacity = capacity
+        self.dtype = None
+        self.rows = 0
+        self.nulls = 0
+        self.min = None
+        self.max = None
+        self.counts = pd.Series(dtype=np.int64)
+        self.hll = HyperLogLog()
+
+    def update(self, series):
+        self.dtype = _common_dtype(self.dtype, series.dtype)
+        null = series.isnull().to_numpy()
+        self.rows += len(series)
+        self.nulls += int(null.sum())
+        values = series[~null]
+        if not len(values):
+            return
+
+        try:
+            lo, hi = values.min(), values.max()
+            self.min = lo if self.min is None else min(self.min, lo)
+            self.max = hi if self.max is None else max(self.max, hi)
+        except TypeError:
+            pass    # mixed types in an object column, no ordering
+
+        self.hll.add_hashes(_hashes(values))
+
+        # Keep the `capacity` most frequent values seen so far, the top ones are exact
+        # as long as the column has fewer distinct values than that
+        counts = self.counts.add(values.value_counts(), fill_value=0)
+        if len(counts) > self.capacity:
+            counts = counts.nlargest(self.capacity)
+        self.counts = counts
+
+    def report(self):
+        top = self.counts.nlargest(self.top).astype(np.int64)
+        return {
+            'dtype': str(self.dtype),
+            'rows': self.rows,
+            'nulls': self.nulls,
+            'null_pct': round(100.0 * self.nulls / self.rows, 2) if self.rows else 0.0,
+            'distinct': self.hll.estimate() if self.rows > self.nulls else 0,
+            'min': self.min,
+            'max': self.max,
+            'top': ', '.join('%s:%d' % (value, count) for value, count in top.items()),
+        }
+
+
+def profile(source, chunksize=100_000, top=3, capacity=10_000, workers=None, **read_kwargs):
+    # source: path to a csv file, a DataFrame or an iterable of DataFrame chunks
+    if isinstance(source, str):
+        chunks = pd.read_csv(source, chunksize=chunksize, **read_kwargs)
+    elif isinstance(source, pd.DataFrame):
+        chunks = (source.iloc[i:i + chunksize] for i in range(0, max(len(source), 1), chunksize))
+    else:
+        chunks = source
+
+    profiles = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for chunk in chunks:
+            for name in chunk.columns:
+                if name not in profiles:
+                    profiles[name] = _ColumnProfile(name, top, capacity)
+            futures = [pool.submit(profiles[name].update, chunk[name]) for name in chunk.columns]
+            for future in futures:
+                future.result()
+
+    return pd.DataFrame.from_dict(
+        {name: p.report() for name, p in profiles.items()}, orient='index'
+    )
+
+
+if __name__ == '__main__':
+    with pd.option_context('display.width', 200, 'display.max_colwidth', 60):
+        for path in sys.argv[1:] or ['data/missing.csv']:
+            print(path)
+            print(profile(path))
@@ -0,0 +1,125 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+# Synthetic versions of titanic.csv, missing.csv, Salary.csv at any size
+#
+# learn() looks at a csv once and keeps, per column:
+#   - numeric: the null rate and 1001 quantiles (sampling is inverse CDF:
+#     uniform numbers interpolated over the quantiles), ints stay ints
+#   - ids (unique, increasing ints like PassengerId): start and step
+#   - categorical (and numbers with few values, like Pclass): the null rate and
+#     the frequency of every value
+#   - free text (names, tickets): sampled from the real values with a row
+#     number suffix so they stay unique-ish
+# generate() writes N rows in chunks, in parallel processes. Every chunk has its
+# own random stream spawned from one seed (SeedSequence.spawn), so the output
+# only depends on the seed and chunk size, not on the number of workers.
+#
+#   python synth.py data/titanic.csv 10000000 /tmp/titanic parquet
+
+_QUANTILES = np.linspace(0, 1, 1001)
+_MAX_CATEGORIES = 1000
+
+
+def learn(path_or_df):
+    df = pd.read_csv(path_or_df) if isinstance(path_or_df, str) else path_or_df
+    model = {'columns': list(df.columns), 'specs': {}}
+    for name in df.columns:
+        s = df[name]
+        values = s.dropna()
+        spec = {'null_rate': float(s.isnull().mean())}
+        few_values = values.nunique() <= 20
+        if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s) and not few_values:
+            is_int = bool(len(values)) and bool((values == np.floor(values)).all())
+            diffs = np.diff(values.to_numpy())
+            if is_int and values.is_unique and len(diffs) and (diffs == diffs[0]).all() and diffs[0] > 0:
+                spec.update(kind='id', start=int(values.iloc[0]), step=int(diffs[0]))
+            else:
+                spec.update(kind='numeric', is_int=is_int,
+                            quantiles=np.quantile(values.to_numpy(dtype=np.float64), _QUANTILES))
+        else:
+            counts = values.value_counts(normalize=True)
+            if few_values or (len(counts) <= _MAX_CATEGORIES and len(counts) <= 0.5 * len(values)):
+                spec.update(kind='categorical', values=counts.index.to_numpy(),
+                            probs=counts.to_numpy())
+            else:
+                spec.update(kind='text', values=values.to_numpy())
+        model['specs'][name] = spec
+    return model
+
+
+def _column(spec, n, first_row, rng):
+    kind = spec['kind']
+    if kind == 'id':
+        return spec['start'] + spec['step'] * np.arange(first_row, first_row + n, dtype=np.int64)
+
+    if kind == 'numeric':
+        col = np.interp(rng.random(n), _QUANTILES, spec['quantiles'])
+        if spec['is_int']:
+            col = np.round(col)
+    elif kind == 'categorical':
+        col = spec['values'][rng.choice(len(spec['values']), size=n, p=spec['probs'])]
+    else:
+        picked = spec['values'][rng.integers(0, len(spec['values']), n)]
+        rows = np.arange(first_row, first_row + n).astype(str)
+        col = np.char.add(np.char.add(picked.astype(str), ' #'), rows).astype(object)
+
+    if spec['null_rate']:
+        missing = rng.random(n) < spec['null_rate']
+        if missing.any():
+            col = col.astype(np.float64 if col.dtype.kind in 'if' else object)
+            col[missing] = np.nan
+    elif kind == 'numeric' and spec['is_int']:
+        col = col.astype(np.int64)
+    return col
+
+
+def generate_frame(model, n, seed=0, first_row=0):
+    # Columns use independent streams, so adding a column doesn't change the others
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    streams = root.spawn(len(model['columns']))
+    return pd.DataFrame({
+        name: _column(model['specs'][name], n, first_row, np.random.default_rng(ss))
+        for name, ss in zip(model['columns'], streams)
+    })
+
+
+def _write_chunk(model, index, rows, first_row, seed, out_dir, fmt):
+    df = generate_frame(model, rows, seed, first_row)
+    path = os.path.join(out_dir, 'part-%05d.%s' % (index, fmt))
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def generate(model, n, out_dir, fmt='csv', chunk_rows=1_000_000, seed=0, workers=None):
+    os.makedirs(out_dir, exist_ok=True)
+    n_chunks = (n + chunk_rows - 1) // chunk_rows
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_write_chunk, model, i, min(chunk_rows, n - i * chunk_rows),
+                        i * chunk_rows, seeds[i], out_dir, fmt)
+            for i in range(n_chunks)
+        ]
+        return [f.result() for f in futures]
+
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else 'data/titanic.csv'
+    n = int(float(sys.argv[2])) if len(sys.argv) > 2 else 1_000_000
+    out_dir = sys.argv[3] if len(sys.argv) > 3 else 'synthetic'
+    fmt = sys.argv[4] if len(sys.argv) > 4 else 'csv'
+
+    start = time.perf_counter()
+    files = generate(learn(path), n, out_dir, fmt)
+    elapsed = time.perf_counter() - start
+    print("%d rows in %d files, %.1fs (%.0f rows/sec)" % (n, len(files), elapsed, n / elapsed))